@@ -0,0 +1,255 @@
+"""Client HTTP de l'API OpenWeatherMap.
+
+- une ``requests.Session`` partagée (pool de connexions keep-alive, TLS réutilisé) ;
+- des timeouts de connexion et de lecture sur chaque requête ;
+- des nouvelles tentatives avec backoff exponentiel et jitter sur 429/5xx ;
+- un disjoncteur qui sert les dernières données connues quand l'API est en panne ;
+- un seau à jetons qui borne le débit de requêtes vers l'API (quota).
+
+L'URL de base est paramétrable pour pouvoir viser un serveur bouchon local.
+requests n'est importé qu'à la première requête réseau : un appel servi par
+le cache ne paie pas son coût d'import.
+"""
+import random
+import re
+import threading
+import time
+
+from metrics import metrics
+
+API_URL = "https://api.openweathermap.org/data/2.5"
+ONECALL_URL = "https://api.openweathermap.org/data/3.0"
+
+# Codes HTTP pour lesquels une nouvelle tentative a un sens
+CODES_A_REESSAYER = {429, 500, 502, 503, 504}
+
+_APPID = re.compile(r"(appid=)[^&\s'\"]+")
+
+
+def _requests():
+    """Import différé de requests"""
+    import requests
+    return requests
+
+
+def masquer_cle(texte):
+    """Remplace la clé API (paramètre ``appid`` des URL) dans un texte"""
+    return _APPID.sub(r"\1***", texte)
+
+
+def message_erreur(e):
+    """Message court pour une exception, sans URL ni clé API (affichage)"""
+    requests = _requests()
+    if isinstance(e, requests.Timeout):
+        return "délai de réponse de l'API dépassé"
+    if isinstance(e, requests.ConnectionError):
+        return "API injoignable"
+    if isinstance(e, requests.RequestException):
+        return "erreur de communication avec l'API"
+    return masquer_cle(str(e))
+
+
+class CircuitBreaker:
+    """Disjoncteur simple : ouvert après ``seuil`` échecs consécutifs"""
+
+    def __init__(self, seuil=3, delai=60):
+        self.seuil = seuil
+        self.delai = delai
+        self.echecs = 0
+        self._ouvert_depuis = None
+        self._lock = threading.Lock()
+
+    @property
+    def ouvert(self):
+        """True tant que l'API est considérée en panne"""
+        with self._lock:
+            if self._ouvert_depuis is None:
+                return False
+            # Après le délai, on laisse passer une requête d'essai (semi-ouvert)
+            return time.monotonic() - self._ouvert_depuis < self.delai
+
+    def succes(self):
+        with self._lock:
+            self.echecs = 0
+            self._ouvert_depuis = None
+
+    def echec(self):
+        with self._lock:
+            self.echecs += 1
+            if self.echecs >= self.seuil:
+                self._ouvert_depuis = time.monotonic()
+
+
+class RateLimiter:
+    """Seau à jetons : au plus ``par_minute`` requêtes par minute, par rafales de ``rafale``"""
+
+    def __init__(self, par_minute=60, rafale=10):
+        self.taux = par_minute / 60.0
+        self.capacite = max(1, min(rafale, par_minute))
+        self._jetons = float(self.capacite)
+        self._dernier = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Bloque jusqu'à ce qu'un jeton soit disponible (thread de travail)"""
+        while True:
+            with self._lock:
+                maintenant = time.monotonic()
+                self._jetons = min(self.capacite, self._jetons + (maintenant - self._dernier) * self.taux)
+                self._dernier = maintenant
+                if self._jetons >= 1:
+                    self._jetons -= 1
+                    return
+                attente = (1 - self._jetons) / self.taux
+            time.sleep(attente)
+
+
+class OpenWeatherClient:
+    """Client partagé pour les endpoints météo et les icônes"""
+
+    def __init__(self, api_key, cache=None, base_url=API_URL, timeout_connexion=3.05,
+                 timeout_lecture=10, tentatives=3, backoff=0.5, backoff_max=8,
+                 taille_pool=10, disjoncteur=None, limiteur=None):
+        self.api_key = api_key
+        self.cache = cache
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (timeout_connexion, timeout_lecture)
+        self.tentatives = tentatives
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.disjoncteur = disjoncteur or CircuitBreaker()
+        self.limiteur = limiteur
+        self.taille_pool = taille_pool
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._appel = threading.local()  # Par thread : état de la dernière requête
+
+    @property
+    def session(self):
+        """Session HTTP partagée, créée à la première requête"""
+        with self._session_lock:
+            if self._session is None:
+                requests = _requests()
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.taille_pool, pool_maxsize=self.taille_pool)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._session = session
+            return self._session
+
+    @property
+    def hors_ligne(self):
+        """True si le disjoncteur est ouvert (données servies depuis le cache)"""
+        return self.disjoncteur.ouvert
+
+    @property
+    def de_secours(self):
+        """True si la dernière requête du thread appelant a servi les dernières
+        données connues (API en panne) plutôt qu'une réponse à jour"""
+        return getattr(self._appel, "secours", False)
+
+    def requete(self, endpoint, params, base_url=None, en_cache=True):
+        """Interroge un endpoint en passant par le cache des réponses.
+
+        Renvoie le code HTTP et les données JSON (None en cas d'erreur). Si
+        l'API est injoignable, les dernières données connues sont servies.
+        ``base_url`` vise une autre API (géocodage, One Call) et ``en_cache``
+        à False contourne le cache des réponses (l'appelant a le sien).
+        Des données de secours sont signalées par ``de_secours``.
+        """
+        self._appel.secours = False
+        cle = self.cache.cle(endpoint, params) if self.cache and en_cache else None
+        if cle is not None:
+            data = self.cache.frais(cle)
+            if data is not None:
+                return 200, data
+
+        if self.disjoncteur.ouvert:
+            return self._secours(cle, 503)
+
+        url = f"{(base_url or self.base_url).rstrip('/')}/{endpoint}"
+        params = dict(params, appid=self.api_key)
+        entetes = self.cache.entetes_conditionnels(cle) if cle is not None else {}
+        requests = _requests()
+        metrics.compter("appels_api", endpoint=endpoint)
+        try:
+            with metrics.chrono("api", endpoint=endpoint):
+                response = self._get(url, params=params, headers=entetes, limite=True)
+                if response.status_code == 304:
+                    data = self.cache.revalider(cle, endpoint, response.headers)
+                    if data is not None:
+                        self.disjoncteur.succes()
+                        return 200, data
+                    response = self._get(url, params=params, limite=True)
+        except requests.RequestException:
+            metrics.compter("erreurs", source="api", endpoint=endpoint)
+            self.disjoncteur.echec()
+            status_code, data = self._secours(cle, None)
+            if data is None:
+                raise
+            return status_code, data
+
+        if response.status_code != 200:
+            metrics.compter("erreurs", source="api", endpoint=endpoint)
+        if response.status_code in CODES_A_REESSAYER:
+            self.disjoncteur.echec()
+            return self._secours(cle, response.status_code)
+
+        self.disjoncteur.succes()
+        if response.status_code == 200:
+            data = response.json()
+            if cle is not None:
+                self.cache.stocker(cle, endpoint, data, response.headers)
+            return 200, data
+        return response.status_code, None
+
+    def telecharger(self, url):
+        """Télécharge un contenu binaire (icônes) via la session partagée"""
+        response = self._get(url)
+        response.raise_for_status()
+        return response.content
+
+    def fermer(self):
+        if self._session is not None:
+            self._session.close()
+
+    def _secours(self, cle, status_code):
+        """Dernières données connues quand l'API ne répond pas"""
+        data = self.cache.dernier_connu(cle) if cle is not None else None
+        if data is not None:
+            self._appel.secours = True
+            return 200, data
+        return status_code, None
+
+    def _get(self, url, limite=False, **kwargs):
+        """GET avec timeouts et nouvelles tentatives sur erreurs transitoires.
+
+        Avec ``limite``, chaque tentative consomme un jeton du limiteur de débit.
+        """
+        requests = _requests()
+        for tentative in range(self.tentatives):
+            derniere = tentative == self.tentatives - 1
+            if limite and self.limiteur is not None:
+                self.limiteur.acquire()
+            try:
+                response = self.session.get(url, timeout=self.timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if derniere:
+                    raise
+                self._attendre(tentative)
+                continue
+            if response.status_code not in CODES_A_REESSAYER or derniere:
+                return response
+            self._attendre(tentative, response.headers.get("Retry-After"))
+        return response
+
+    def _attendre(self, tentative, retry_after=None):
+        """Backoff exponentiel avec jitter complet (borné par backoff_max)"""
+        if retry_after is not None:
+            try:
+                time.sleep(min(float(retry_after), self.backoff_max))
+                return
+            except ValueError:
+                pass
+        time.sleep(random.uniform(0, min(self.backoff_max, self.backoff * 2 ** tentative)))
@@ -0,0 +1,14 @@
+"""Emplacements des fichiers locaux (caches, instantanés) de l'application."""
+import os
+
+
+def cache_dir(*parts):
+    """Renvoie (et crée) un sous-dossier du cache de l'application.
+
+    Le dossier racine vaut ``METEO_CACHE_DIR`` s'il est défini, sinon
+    ``~/.cache/meteo-weather``.
+    """
+    racine = os.getenv("METEO_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "meteo-weather")
+    chemin = os.path.join(racine, *parts)
+    os.makedirs(chemin, exist_ok=True)
+    return chemin
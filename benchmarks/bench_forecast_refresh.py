@@ -0,0 +1,103 @@
+"""Benchmark : actualisation de l'onglet prévisions, avant / après.
+
+Compare l'ancienne approche (détruire puis recréer tous les créneaux à
+chaque actualisation) avec ``PrevisionsView`` (liste virtualisée à widgets
+persistants, seules les options modifiées sont reconfigurées). Nécessite un
+affichage (ou Xvfb).
+
+    python benchmarks/bench_forecast_refresh.py [--refreshs 50] [--creneaux 40]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import tkinter as tk
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from views import PrevisionsView  # noqa: E402
+
+
+def jours_synthetiques(photo, decalage=0.0, creneaux=40):
+    """Prévisions 5 jours fictives, au format attendu par PrevisionsView"""
+    debut = datetime(2024, 1, 1, 0, 0)
+    jours = {}
+    for i in range(creneaux):
+        date = debut + timedelta(hours=3 * i)
+        jours.setdefault(date.date(), []).append(
+            (date.strftime('%H:%M'), photo, 10 + (i % 8) + decalage, "ciel dégagé")
+        )
+    return [
+        (jour, jour.strftime("%A %d %B").capitalize(), creneaux,
+         f"Résumé : Ciel dégagé - Min 10.0°C / Max {17 + decalage:.1f}°C")
+        for jour, creneaux in jours.items()
+    ]
+
+
+def reconstruire(parent, jours):
+    """Reproduction de l'ancien afficher_previsions (tout détruire / recréer)"""
+    for widget in parent.winfo_children():
+        widget.destroy()
+    main_container = tk.Frame(parent, bg="white")
+    main_container.grid(row=0, column=0, sticky="nsew", padx=20)
+    for i, (_, date_str, creneaux, resume) in enumerate(jours):
+        jour_frame = tk.Frame(main_container, bg="white", bd=1, relief=tk.RIDGE)
+        jour_frame.grid(row=i, column=0, sticky="ew", padx=5, pady=5)
+        tk.Label(jour_frame, text=date_str, font=("Arial", 12, "bold"), bg="white").pack(fill=tk.X, padx=5, pady=5)
+        heures_container = tk.Frame(jour_frame, bg="white")
+        heures_container.pack(fill=tk.X, padx=5, pady=5)
+        heures_frame = tk.Frame(heures_container, bg="white")
+        heures_frame.pack(expand=True, anchor='center')
+        for heure, photo, temperature, description in creneaux:
+            heure_frame = tk.Frame(heures_frame, bg="white", width=100)
+            heure_frame.pack(side=tk.LEFT, padx=10, fill=tk.Y)
+            tk.Label(heure_frame, text=heure, font=("Arial", 10), bg="white").pack()
+            tk.Label(heure_frame, image=photo, bg="white").pack()
+            tk.Label(heure_frame, text=f"{temperature:.1f}°C", font=("Arial", 10), bg="white").pack()
+            tk.Label(heure_frame, text=description, font=("Arial", 8), bg="white", wraplength=80).pack()
+        resume_frame = tk.Frame(jour_frame, bg="#f5f5f5")
+        resume_frame.pack(fill=tk.X, padx=5, pady=5)
+        tk.Label(resume_frame, text=resume, font=("Arial", 10, "italic"), bg="#f5f5f5").pack()
+
+
+def mesurer(root, actualiser, refreshs):
+    durees = []
+    for i in range(refreshs):
+        debut = time.perf_counter()
+        actualiser(i)
+        root.update_idletasks()
+        durees.append((time.perf_counter() - debut) * 1000)
+    return durees
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--refreshs", type=int, default=50)
+    parser.add_argument("--creneaux", type=int, default=40, help="créneaux de 3 h (40 = 5 jours)")
+    args = parser.parse_args()
+
+    root = tk.Tk()
+    root.geometry("900x700")
+    photo = tk.PhotoImage(width=50, height=50)
+
+    avant = tk.Frame(root)
+    avant.pack(fill=tk.BOTH, expand=True)
+    durees_avant = mesurer(
+        root, lambda i: reconstruire(avant, jours_synthetiques(photo, i % 2, args.creneaux)), args.refreshs)
+    avant.destroy()
+
+    canvas = tk.Canvas(root, bg="white")
+    canvas.pack(fill=tk.BOTH, expand=True)
+    vue = PrevisionsView(canvas)
+    durees_apres = mesurer(
+        root, lambda i: vue.mettre_a_jour(jours_synthetiques(photo, i % 2, args.creneaux)), args.refreshs)
+
+    for nom, durees in (("avant (détruire/recréer)", durees_avant), ("après (liste virtualisée)", durees_apres)):
+        print(f"{nom:30s} médiane {statistics.median(durees):7.2f} ms   max {max(durees):7.2f} ms")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
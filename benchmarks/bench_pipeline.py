@@ -0,0 +1,453 @@
+"""Benchmark du pipeline récupération -> traitement -> rendu.
+
+Rejoue des réponses ``/weather`` et ``/forecast`` enregistrées
+(``benchmarks/fixtures``) depuis le serveur bouchon local et mesure
+séparément :
+
+- la récupération (``ServiceMeteo`` : géocodage et requêtes, cache froid
+  puis chaud) ;
+- ``traiter_previsions`` ;
+- ``afficher_meteo_actuelle``, ``afficher_previsions`` et
+  ``creer_graphiques`` sur une vraie ``AppMeteo`` (Tk, figure rendue par
+  Agg via FigureCanvasTkAgg) ;
+- le tableau de bord multi-villes.
+
+« Froid » est le premier appel sur une application neuve (caches,
+widgets et figure vides), « chaud » la médiane des appels suivants, chacun
+avec des données modifiées pour que les vues soient réellement mises à
+jour. Les prévisions enregistrées sont répétées pour atteindre chaque
+nombre de créneaux demandé (``--lignes``), et rejouées sous d'autres noms
+pour chaque nombre de villes (``--villes``).
+
+Tk a besoin d'un affichage : sous Linux sans ``DISPLAY``, Xvfb est lancé
+s'il est installé (ou utiliser ``xvfb-run``). Les résultats sont écrits en
+JSON pour comparer deux versions :
+
+    python benchmarks/bench_pipeline.py --sortie avant.json
+    python benchmarks/bench_pipeline.py --sortie apres.json --comparer avant.json
+    python benchmarks/bench_pipeline.py --enregistrer "Paris,FR"   # nouvelles fixtures (API réelle)
+"""
+import argparse
+import copy
+import glob
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_upstream import StubUpstream  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Rapport des médianes à chaud signalé comme régression par --comparer
+SEUIL_REGRESSION = 1.25
+# Écart absolu en dessous duquel on ne parle pas de régression (bruit)
+ECART_MIN_MS = 1.0
+
+
+def nom_fixture(ville):
+    return "".join(c if c.isalnum() else "_" for c in ville.lower())
+
+
+def charger_fixture(nom=None):
+    """Réponses /weather et /forecast enregistrées (la première par défaut)"""
+    if nom is None:
+        fichiers = sorted(glob.glob(os.path.join(FIXTURES, "*.weather.json")))
+        if not fichiers:
+            sys.exit(f"aucune fixture dans {FIXTURES} (voir --enregistrer)")
+        nom = os.path.basename(fichiers[0])[:-len(".weather.json")]
+    with open(os.path.join(FIXTURES, f"{nom}.weather.json"), encoding="utf-8") as f:
+        meteo = json.load(f)
+    with open(os.path.join(FIXTURES, f"{nom}.forecast.json"), encoding="utf-8") as f:
+        previsions = json.load(f)
+    return nom, meteo, previsions
+
+
+def enregistrer(villes):
+    """Enregistre les réponses réelles de l'API (clé de .env) comme fixtures"""
+    from meteo_core import ServiceMeteo
+
+    service = ServiceMeteo()
+    try:
+        for ville in villes:
+            meteo = service.obtenir_meteo_actuelle(ville)
+            previsions = service.obtenir_previsions(ville)
+            if not (meteo and previsions):
+                print(f"{ville} : réponse invalide, ignorée", file=sys.stderr)
+                continue
+            for suffixe, payload in (("weather", meteo), ("forecast", previsions)):
+                chemin = os.path.join(FIXTURES, f"{nom_fixture(ville)}.{suffixe}.json")
+                with open(chemin, "w", encoding="utf-8") as f:
+                    json.dump(payload, f, ensure_ascii=False, indent=1)
+                print(chemin)
+    finally:
+        service.fermer()
+
+
+def etendre(previsions, lignes):
+    """Prévisions de ``lignes`` créneaux : la liste enregistrée répétée à la suite"""
+    source = previsions["list"]
+    pas = source[1]["dt"] - source[0]["dt"] if len(source) > 1 else 10800
+    liste = []
+    for i in range(lignes):
+        entree = copy.deepcopy(source[i % len(source)])
+        entree["dt"] = source[0]["dt"] + i * pas
+        entree.pop("dt_txt", None)
+        liste.append(entree)
+    return dict(previsions, cnt=lignes, list=liste)
+
+
+def variante(payload, i):
+    """Copie aux températures décalées : une nouvelle version des données"""
+    payload = copy.deepcopy(payload)
+    for entree in payload.get("list", [payload]):
+        entree["main"]["temp"] = round(entree["main"]["temp"] + 0.1 * (i + 1), 2)
+    return payload
+
+
+def renommer(meteo, previsions, ville):
+    nom = ville.split(",")[0]
+    return dict(meteo, name=nom), dict(previsions, city=dict(previsions["city"], name=nom))
+
+
+def chronometrer(froid, chaud, repetitions, preparer=None):
+    """Durée du premier appel (froid) puis médiane et max des suivants (chaud), en ms"""
+    durees = []
+    for i in range(repetitions + 1):
+        if preparer is not None:
+            preparer(i)
+        debut = time.perf_counter()
+        (froid if i == 0 else chaud)()
+        durees.append((time.perf_counter() - debut) * 1000)
+    chauds = durees[1:] or durees
+    return {"froid_ms": round(durees[0], 3), "chaud_ms": round(statistics.median(chauds), 3),
+            "chaud_max_ms": round(max(chauds), 3)}
+
+
+def nouveau_cache():
+    """Caches (réponses, icônes, géocodage, historique) vides pour la prochaine application"""
+    os.environ["METEO_CACHE_DIR"] = tempfile.mkdtemp(prefix="meteo-bench-")
+
+
+def recuperer(villes, repetitions):
+    """Récupération des villes en parallèle, cache des réponses froid puis chaud"""
+    from meteo_core import DASHBOARD_CONCURRENCE, ServiceMeteo
+
+    nouveau_cache()
+    service = ServiceMeteo()
+
+    def toutes():
+        def obtenir(ville):
+            return service.obtenir_meteo_actuelle(ville), service.obtenir_previsions(ville)
+        with ThreadPoolExecutor(max_workers=min(len(villes), DASHBOARD_CONCURRENCE)) as pool:
+            resultats = list(pool.map(obtenir, villes))
+        if not all(meteo and previsions for meteo, previsions in resultats):
+            raise RuntimeError("réponse manquante du serveur bouchon")
+        return resultats
+
+    try:
+        return chronometrer(toutes, toutes, repetitions)
+    finally:
+        service.fermer()
+
+
+def lancer_xvfb():
+    """Affichage virtuel si Tk n'en a pas (Linux); renvoie le processus à arrêter"""
+    if not sys.platform.startswith("linux") or os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"):
+        return None
+    if shutil.which("Xvfb") is None:
+        sys.exit("aucun affichage : installer Xvfb ou lancer sous xvfb-run")
+    for numero in range(99, 120):
+        if not os.path.exists(f"/tmp/.X11-unix/X{numero}") and not os.path.exists(f"/tmp/.X{numero}-lock"):
+            break
+    processus = subprocess.Popen(["Xvfb", f":{numero}", "-screen", "0", "1280x1024x24", "-nolisten", "tcp"],
+                                 stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    for _ in range(100):
+        if os.path.exists(f"/tmp/.X11-unix/X{numero}"):
+            break
+        time.sleep(0.05)
+    os.environ["DISPLAY"] = f":{numero}"
+    return processus
+
+
+class Banc:
+    """Applications neuves branchées sur le serveur bouchon"""
+
+    def __init__(self, repetitions):
+        self.repetitions = repetitions
+
+    def application(self):
+        import tkinter as tk
+
+        from main import AppMeteo
+
+        class AppBanc(AppMeteo):
+            def rechercher_ville(self):
+                pass  # Pas de recherche au lancement : les étapes sont appelées une à une
+
+        nouveau_cache()
+        root = tk.Tk()
+        app = AppBanc(root)
+        app.scheduler.arreter()
+        while not root.winfo_ismapped():
+            root.update()
+        return app
+
+    @staticmethod
+    def fermer(app):
+        app.fetch_engine.shutdown()
+        app.icon_engine.shutdown()
+        if app.dashboard_engine is not None:
+            app.dashboard_engine.shutdown()
+        app.service.fermer()
+        app.historique.fermer()
+        app.root.destroy()
+
+    def etapes(self, meteo, previsions):
+        """Les quatre étapes mesurées séparément sur une application neuve"""
+        from meteo_core import empreinte, traiter_previsions
+
+        app = self.application()
+        root = app.root
+        repetitions = self.repetitions
+        meteos = [variante(meteo, i) for i in range(repetitions + 1)]
+        toutes = [variante(previsions, i) for i in range(repetitions + 1)]
+        resultats = {}
+        etat = {"i": 0}
+
+        def suivante(i):
+            etat["i"] = i
+
+        def traiter():
+            traiter_previsions(toutes[etat["i"]])
+        resultats["traiter_previsions"] = chronometrer(traiter, traiter, repetitions, suivante)
+
+        def afficher_meteo():
+            app.afficher_meteo_actuelle()
+            root.update_idletasks()
+
+        def meteo_suivante(i):
+            app.meteo_actuelle = meteos[i]
+        resultats["afficher_meteo_actuelle"] = chronometrer(afficher_meteo, afficher_meteo, repetitions, meteo_suivante)
+
+        # Le DataFrame est calculé hors mesure : seul le rendu est chronométré
+        def previsions_suivantes(i):
+            app.previsions = toutes[i]
+            app._version_previsions = empreinte(app.previsions)
+            app.donnees_previsions()
+
+        def afficher_previsions():
+            app.afficher_previsions()
+            root.update_idletasks()
+        resultats["afficher_previsions"] = chronometrer(
+            afficher_previsions, afficher_previsions, repetitions, previsions_suivantes)
+
+        # Défilement d'une page (retour en haut une fois la fin atteinte)
+        canvas = app.forecast_canvas
+
+        def haut_si_fin(i):
+            if canvas.yview()[1] >= 1.0:
+                canvas.yview_moveto(0)
+                root.update_idletasks()
+
+        def defiler():
+            canvas.yview_scroll(1, "pages")
+            root.update_idletasks()
+        resultats["defilement_previsions"] = chronometrer(defiler, defiler, repetitions, haut_si_fin)
+        resultats["defilement_previsions"]["lignes_realisees"] = app.previsions_view.nb_widgets
+
+        # Onglet affiché avant la mesure : la figure est rendue à sa vraie taille
+        app._vues_sales.clear()
+        app.notebook.select(1)
+        root.update()
+
+        def graphiques():
+            app.creer_graphiques()
+            root.update_idletasks()
+        resultats["creer_graphiques"] = chronometrer(graphiques, graphiques, repetitions, previsions_suivantes)
+
+        self.fermer(app)
+        return resultats
+
+    def actualisation(self, ville):
+        """Recherche d'une ville, de la requête au rendu des vues visibles"""
+        app = self.application()
+        root = app.root
+        app.ville_actuelle = ville
+        debut = time.perf_counter()
+        app.scheduler.executer_maintenant("benchmark")
+        while app.meteo_actuelle is None or app._vues_sales & {"meteo", "previsions"}:
+            if time.perf_counter() - debut > 60:
+                raise RuntimeError(f"pas de rendu après 60 s : {app.status_bar.cget('text')}")
+            root.update()
+            time.sleep(0.001)
+        duree = (time.perf_counter() - debut) * 1000
+        app.scheduler.arreter()
+        self.fermer(app)
+        return round(duree, 3)
+
+    def tableau(self, resultats):
+        """Tableau de bord : une ligne par ville, créée puis mise à jour"""
+        import tkinter as tk
+
+        from views import TableauVillesView
+
+        root = tk.Tk()
+        vue = TableauVillesView(root, list(resultats), lambda ville: None)
+        root.update()
+        versions = {ville: [variante(meteo, i) for i in range(self.repetitions + 1)]
+                    for ville, meteo in resultats.items()}
+        etat = {"i": 0}
+
+        def suivante(i):
+            etat["i"] = i
+
+        def mettre_a_jour():
+            for ville, meteos in versions.items():
+                vue.mettre_a_jour(ville, meteos[etat["i"]], "12:00:00")
+            root.update_idletasks()
+        mesure = chronometrer(mettre_a_jour, mettre_a_jour, self.repetitions, suivante)
+        root.destroy()
+        return mesure
+
+
+def comparer(resultats, reference, seuil):
+    """Affiche les écarts de médiane à chaud; renvoie le nombre de régressions"""
+    def etapes(donnees):
+        for ligne in donnees.get("lignes", []):
+            for etape, mesure in ligne["etapes"].items():
+                yield f"{etape} ({ligne['lignes']} créneaux)", mesure["chaud_ms"]
+        for ligne in donnees.get("villes", []):
+            for etape in ("recuperation", "tableau"):
+                yield f"{etape} ({ligne['villes']} villes)", ligne[etape]["chaud_ms"]
+
+    avant = dict(etapes(reference))
+    regressions = 0
+    for nom, apres in etapes(resultats):
+        if nom not in avant or not avant[nom]:
+            continue
+        rapport = apres / avant[nom]
+        marque = ""
+        if rapport > seuil and apres - avant[nom] > ECART_MIN_MS:
+            marque = "  <- régression"
+            regressions += 1
+        print(f"{nom:45s} {avant[nom]:9.2f} -> {apres:9.2f} ms  x{rapport:.2f}{marque}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixture", help="nom de la fixture (défaut : la première de benchmarks/fixtures)")
+    parser.add_argument("--lignes", default="40,200,1000", help="nombres de créneaux de prévision")
+    parser.add_argument("--villes", default="1,10,50", help="nombres de villes")
+    parser.add_argument("--repetitions", type=int, default=10)
+    parser.add_argument("--latence", type=float, default=0.0, help="latence simulée du bouchon (s)")
+    parser.add_argument("--sortie", default="bench_pipeline.json")
+    parser.add_argument("--comparer", metavar="REFERENCE", help="résultats JSON d'une version précédente")
+    parser.add_argument("--seuil", type=float, default=SEUIL_REGRESSION, help="rapport signalé comme régression")
+    parser.add_argument("--enregistrer", nargs="+", metavar="VILLE", help="enregistrer des fixtures depuis l'API réelle")
+    args = parser.parse_args()
+
+    if args.enregistrer:
+        enregistrer(args.enregistrer)
+        return 0
+
+    nom, meteo, previsions = charger_fixture(args.fixture)
+    amont = StubUpstream(latence=args.latence).demarrer()
+    os.environ["API_BASE_URL"] = amont.url
+    os.environ.setdefault("API_KEY", "bench")
+    os.environ["API_LIMITE_PAR_MINUTE"] = "100000"
+    os.environ["VILLE"] = ""
+    os.environ.pop("VILLES_FICHIER", None)
+    os.environ.pop("METEO_METRIQUES_FICHIER", None)
+    xvfb = lancer_xvfb()
+
+    # Imports hors mesure : « froid » désigne les caches et widgets vides
+    debut = time.perf_counter()
+    import matplotlib
+    matplotlib.use("Agg")
+    import pandas  # noqa: F401
+    import icon_cache
+    from main import AppMeteo  # noqa: F401
+    from matplotlib.backends import backend_tkagg  # noqa: F401
+    imports = (time.perf_counter() - debut) * 1000
+
+    # Icônes servies par le bouchon plutôt que par openweathermap.org
+    icon_cache.ICON_URL = amont.url + "/img/wn/{code}{variante}.png"
+    banc = Banc(args.repetitions)
+    resultats = {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plateforme": platform.platform(),
+        "matplotlib": matplotlib.__version__,
+        "fixture": nom,
+        "repetitions": args.repetitions,
+        "latence_s": args.latence,
+        "imports_ms": round(imports, 3),
+        "lignes": [],
+        "villes": [],
+    }
+    try:
+        for lignes in (int(n) for n in args.lignes.split(",")):
+            ville = f"Lignes{lignes},FR"
+            meteo_v, previsions_v = renommer(meteo, etendre(previsions, lignes), ville)
+            amont.reponses[("/weather", ville)] = meteo_v
+            amont.reponses[("/forecast", ville)] = previsions_v
+            ligne = {"lignes": lignes, "etapes": banc.etapes(meteo_v, previsions_v),
+                     "actualisation_ms": banc.actualisation(ville)}
+            resultats["lignes"].append(ligne)
+            print(f"{lignes:5d} créneaux : " + ", ".join(
+                f"{etape} {m['froid_ms']:.1f}/{m['chaud_ms']:.1f} ms" for etape, m in ligne["etapes"].items()
+            ) + f", actualisation {ligne['actualisation_ms']:.1f} ms")
+
+        for nombre in (int(n) for n in args.villes.split(",")):
+            villes = [f"Ville{nombre}-{i:03d},FR" for i in range(nombre)]
+            for ville in villes:
+                meteo_v, previsions_v = renommer(meteo, previsions, ville)
+                amont.reponses[("/weather", ville)] = meteo_v
+                amont.reponses[("/forecast", ville)] = previsions_v
+            from meteo_core import traiter_previsions
+            debut = time.perf_counter()
+            for ville in villes:
+                traiter_previsions(amont.reponses[("/forecast", ville)])
+            traitement = (time.perf_counter() - debut) * 1000
+            ligne = {
+                "villes": nombre,
+                "recuperation": recuperer(villes, args.repetitions),
+                "traitement_ms": round(traitement, 3),
+                "tableau": banc.tableau({ville: amont.reponses[("/weather", ville)] for ville in villes}),
+            }
+            resultats["villes"].append(ligne)
+            print(f"{nombre:5d} villes   : récupération {ligne['recuperation']['froid_ms']:.1f}/"
+                  f"{ligne['recuperation']['chaud_ms']:.1f} ms, traitement {ligne['traitement_ms']:.1f} ms, "
+                  f"tableau {ligne['tableau']['froid_ms']:.1f}/{ligne['tableau']['chaud_ms']:.1f} ms")
+    finally:
+        amont.arreter()
+        if xvfb is not None:
+            xvfb.terminate()
+
+    resultats["appels_amont"] = amont.appels
+    with open(args.sortie, "w", encoding="utf-8") as f:
+        json.dump(resultats, f, ensure_ascii=False, indent=2)
+    print(f"(froid/chaud) résultats écrits dans {args.sortie}")
+
+    if args.comparer:
+        with open(args.comparer, encoding="utf-8") as f:
+            reference = json.load(f)
+        if comparer(resultats, reference, args.seuil):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
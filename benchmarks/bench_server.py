@@ -0,0 +1,93 @@
+"""Test de charge du mode serveur (meteo_server.py) contre un amont bouchon.
+
+Lance un serveur bouchon OpenWeatherMap (avec latence), le serveur météo
+dans le même processus, puis ``--clients`` connexions keep-alive qui
+interrogent ``--villes`` villes pendant ``--duree`` secondes. Affiche les
+requêtes/s, les latences p50/p99 et le nombre d'appels amont, ce qui montre
+l'effet du cache partagé et du regroupement des requêtes (single-flight).
+
+    python benchmarks/bench_server.py --clients 50 --villes 10 --duree 10
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_upstream import StubUpstream  # noqa: E402
+
+
+async def client(port, villes, routes, fin, latences, erreurs):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        while time.perf_counter() < fin:
+            chemin = f"{random.choice(routes)}?ville={random.choice(villes)}"
+            debut = time.perf_counter()
+            writer.write(f"GET {chemin} HTTP/1.1\r\nHost: bench\r\n\r\n".encode())
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            longueur = 0
+            while True:
+                ligne = await reader.readline()
+                if ligne == b"\r\n":
+                    break
+                nom, _, valeur = ligne.decode().partition(":")
+                if nom.lower() == "content-length":
+                    longueur = int(valeur)
+            await reader.readexactly(longueur)
+            latences.append(time.perf_counter() - debut)
+            if status != 200:
+                erreurs.append(status)
+    finally:
+        writer.close()
+
+
+async def bench(args):
+    amont = StubUpstream(latence=args.latence).demarrer()
+    os.environ["API_BASE_URL"] = amont.url
+    os.environ.setdefault("API_KEY", "bench")
+    os.environ["API_LIMITE_PAR_MINUTE"] = "100000"
+    os.environ["METEO_CACHE_DIR"] = tempfile.mkdtemp(prefix="meteo-bench-")
+
+    from meteo_server import MeteoServer
+
+    serveur = MeteoServer()
+    await serveur.demarrer("127.0.0.1", 0)
+    villes = [f"Ville{i},FR" for i in range(args.villes)]
+    routes = ["/meteo", "/previsions", "/previsions/traitees"]
+
+    latences, erreurs = [], []
+    debut = time.perf_counter()
+    fin = debut + args.duree
+    await asyncio.gather(*(client(serveur.port, villes, routes, fin, latences, erreurs) for _ in range(args.clients)))
+    duree = time.perf_counter() - debut
+    await serveur.fermer()
+    amont.arreter()
+
+    latences.sort()
+    print(f"clients={args.clients} villes={args.villes} latence amont={args.latence * 1000:.0f} ms")
+    print(f"requêtes        : {len(latences)} ({len(erreurs)} erreurs)")
+    print(f"débit           : {len(latences) / duree:.0f} req/s")
+    print(f"latence p50     : {statistics.median(latences) * 1000:.2f} ms")
+    print(f"latence p99     : {latences[int(len(latences) * 0.99) - 1] * 1000:.2f} ms")
+    print(f"appels amont    : {amont.appels}")
+    print(f"regroupements   : {serveur.stats['coalescees']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--villes", type=int, default=10)
+    parser.add_argument("--duree", type=float, default=10.0)
+    parser.add_argument("--latence", type=float, default=0.1, help="latence de l'amont bouchon (s)")
+    asyncio.run(bench(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Vérification du client HTTP face à un amont dégradé (serveur bouchon).
+
+Exerce contre ``StubUpstream.panne()`` les nouvelles tentatives sur 5xx, le
+respect de ``Retry-After`` sur 429, le timeout de lecture et l'ouverture du
+disjoncteur avec repli sur les dernières données connues (signalées par
+``de_secours``). Code de sortie 1 si un scénario échoue.
+
+    python benchmarks/check_resilience.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from api_client import CircuitBreaker, OpenWeatherClient  # noqa: E402
+from response_cache import ResponseCache  # noqa: E402
+from stub_upstream import StubUpstream  # noqa: E402
+
+
+def client(amont, **options):
+    # TTL nul : chaque appel va sur le réseau, le cache ne sert que de secours
+    cache = ResponseCache({"weather": 0}, chemin=os.path.join(tempfile.mkdtemp(prefix="meteo-check-"), "r.json"))
+    options.setdefault("backoff", 0.05)
+    return OpenWeatherClient("check", cache=cache, base_url=amont.url, **options)
+
+
+def nouvelles_tentatives(amont):
+    api = client(amont)
+    avant = amont.appels.get("/weather", 0)
+    amont.panne(503, nombre=2)
+    status, data = api.requete("weather", {"q": "Paris"})
+    appels = amont.appels["/weather"] - avant
+    return status == 200 and data is not None and appels == 3, f"{appels} appels, statut {status}"
+
+
+def retry_after(amont):
+    api = client(amont)
+    amont.panne(429, nombre=1, retry_after=1)
+    debut = time.perf_counter()
+    status, _ = api.requete("weather", {"q": "Lyon"})
+    duree = time.perf_counter() - debut
+    return status == 200 and duree >= 1.0, f"statut {status} après {duree:.2f} s"
+
+
+def timeout_lecture(amont):
+    import requests
+
+    api = client(amont, timeout_lecture=0.2, tentatives=2)
+    amont.panne(code=None, nombre=2, latence=0.5)
+    try:
+        api.requete("weather", {"q": "Nice"})
+    except requests.Timeout:
+        return True, "Timeout levé après 2 tentatives"
+    return False, "pas de Timeout"
+
+
+def disjoncteur(amont):
+    api = client(amont, disjoncteur=CircuitBreaker(seuil=3, delai=60))
+    api.requete("weather", {"q": "Brest"})  # Dernière donnée connue
+    amont.panne(500)
+    try:
+        # Secours signalé dès le premier échec, avant l'ouverture du disjoncteur
+        resultats, signales = [], []
+        for _ in range(3):
+            resultats.append(api.requete("weather", {"q": "Brest"}))
+            signales.append(api.de_secours)
+        avant = amont.appels["/weather"]
+        status, data = api.requete("weather", {"q": "Brest"})
+        signales.append(api.de_secours)
+        court_circuite = amont.appels["/weather"] == avant
+    finally:
+        amont.retablir()
+    ok = (all(r[0] == 200 for r in resultats) and all(signales) and api.hors_ligne
+          and court_circuite and status == 200 and data is not None)
+    return ok, (f"secours signalé={signales}, hors_ligne={api.hors_ligne}, "
+                f"amont court-circuité={court_circuite}, erreurs={amont.erreurs}")
+
+
+SCENARIOS = (nouvelles_tentatives, retry_after, timeout_lecture, disjoncteur)
+
+
+def main():
+    amont = StubUpstream().demarrer()
+    echecs = 0
+    try:
+        for scenario in SCENARIOS:
+            amont.retablir()
+            ok, detail = scenario(amont)
+            echecs += not ok
+            print(f"{'OK   ' if ok else 'ÉCHEC'} {scenario.__name__:22s} {detail}")
+    finally:
+        amont.arreter()
+    sys.exit(1 if echecs else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""Serveur bouchon OpenWeatherMap pour les benchmarks.
+
+Sert ``/weather``, ``/forecast``, le géocodage ``/direct``, ``/onecall`` et
+les icônes ``/img/wn/<code>.png`` avec une latence configurable, et compte
+les appels reçus. À utiliser avec ``API_BASE_URL`` pointant vers
+``http://127.0.0.1:<port>``. Les requêtes par coordonnées sont rattachées à
+la ville géocodée à ces coordonnées.
+
+``panne()`` simule un amont dégradé pour exercer les nouvelles tentatives,
+``Retry-After`` et le disjoncteur du client : réponses 429/5xx (toutes ou une
+proportion, pour les N requêtes suivantes ou jusqu'à ``retablir()``) et
+latence ajoutée (au-delà du timeout de lecture pour simuler un amont figé).
+"""
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+DESCRIPTIONS = [("ciel dégagé", "01d"), ("peu nuageux", "02d"), ("nuageux", "04d"),
+                ("pluie légère", "10d"), ("neige", "13n"), ("couvert", "04n")]
+
+
+def meteo_synthetique(ville, dt=1700000000, graine=0):
+    """Réponse /weather fictive mais de même forme que l'API"""
+    r = random.Random(f"{ville}-{graine}")
+    description, icon = r.choice(DESCRIPTIONS)
+    return {
+        "name": ville.split(",")[0], "dt": dt, "sys": {"country": "FR"},
+        "weather": [{"description": description, "icon": icon}],
+        "main": {"temp": round(r.uniform(-5, 30), 2), "feels_like": round(r.uniform(-8, 30), 2),
+                 "temp_min": 0.0, "temp_max": 30.0, "humidity": r.randint(20, 100), "pressure": r.randint(990, 1030)},
+        "wind": {"speed": round(r.uniform(0, 15), 2), "deg": r.randint(0, 359)},
+        "visibility": 10000,
+    }
+
+
+def previsions_synthetiques(ville, lignes=40, dt=1700000000, pas=10800, graine=0):
+    """Réponse /forecast fictive de ``lignes`` créneaux espacés de ``pas`` secondes"""
+    r = random.Random(f"{ville}-{graine}")
+    liste = []
+    for i in range(lignes):
+        description, icon = r.choice(DESCRIPTIONS)
+        prevision = {
+            "dt": dt + i * pas,
+            "main": {"temp": round(r.uniform(-5, 30), 2), "feels_like": round(r.uniform(-8, 30), 2),
+                     "humidity": r.randint(20, 100), "pressure": r.randint(990, 1030)},
+            "weather": [{"description": description, "icon": icon}],
+            "wind": {"speed": round(r.uniform(0, 15), 2), "deg": r.randint(0, 359)},
+        }
+        if i % 3 == 0:
+            prevision["rain"] = {"3h": round(r.uniform(0, 4), 2)}
+        if i % 7 == 0:
+            prevision["snow"] = {"3h": round(r.uniform(0, 2), 2)}
+        liste.append(prevision)
+    return {"cod": "200", "cnt": lignes, "list": liste, "city": {"name": ville.split(",")[0], "timezone": 3600}}
+
+
+def lieu_synthetique(ville):
+    """Réponse /direct (géocodage) : coordonnées stables dérivées du nom"""
+    nom, _, pays = ville.partition(",")
+    h = int(hashlib.sha1(ville.strip().lower().encode()).hexdigest()[:8], 16)
+    return [{"name": nom.strip(), "country": pays.strip().upper() or "FR",
+             "lat": round(-60 + (h % 12000) / 100, 4), "lon": round(-180 + (h // 12000 % 36000) / 100, 4)}]
+
+
+def onecall_synthetique(ville, dt=1700000000, graine=0):
+    """Réponse /onecall fictive : actuelle, 48 heures et 8 jours"""
+    r = random.Random(f"{ville}-{graine}")
+
+    def conditions(temp):
+        description, icon = r.choice(DESCRIPTIONS)
+        return {"temp": temp, "feels_like": round(temp - r.uniform(0, 3), 2),
+                "humidity": r.randint(20, 100), "pressure": r.randint(990, 1030),
+                "wind_speed": round(r.uniform(0, 15), 2), "wind_deg": r.randint(0, 359),
+                "weather": [{"description": description, "icon": icon}]}
+
+    actuelle = dict(conditions(round(r.uniform(-5, 30), 2)), dt=dt, visibility=10000)
+    heures = []
+    for i in range(48):
+        heure = dict(conditions(round(r.uniform(-5, 30), 2)), dt=dt + i * 3600)
+        if i % 5 == 0:
+            heure["rain"] = {"1h": round(r.uniform(0, 2), 2)}
+        heures.append(heure)
+    jours = []
+    for i in range(8):
+        jour = conditions(0)
+        temp = round(r.uniform(-5, 30), 2)
+        jour.update(dt=dt + i * 86400 + 43200, rain=round(r.uniform(0, 8), 2),
+                    temp={"day": temp, "min": temp - 5, "max": temp + 5}, feels_like={"day": temp - 1})
+        jours.append(jour)
+    return {"lat": 0.0, "lon": 0.0, "timezone_offset": 3600, "current": actuelle, "hourly": heures, "daily": jours}
+
+
+class StubUpstream:
+    """Serveur bouchon dans un thread; ``appels`` compte les requêtes reçues par route"""
+
+    def __init__(self, latence=0.0, lignes=40, reponses=None):
+        self.latence = latence
+        self.lignes = lignes
+        self.reponses = reponses or {}  # (route, ville) -> payload enregistrée
+        self.appels = {}
+        self.erreurs = {}  # code HTTP simulé -> nombre de réponses
+        self._panne = None
+        self._hasard = random.Random(0)
+        self._lieux = {}  # (lat, lon) -> ville géocodée
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                ville = stub.ville(parse_qs(url.query))
+                with stub._lock:
+                    stub.appels[url.path] = stub.appels.get(url.path, 0) + 1
+                panne = stub._panne_courante()
+                latence = stub.latence + (panne["latence"] if panne else 0)
+                if latence:
+                    time.sleep(latence)
+                if panne and panne["code"]:
+                    self.send_response(panne["code"])
+                    if panne["retry_after"] is not None:
+                        self.send_header("Retry-After", str(panne["retry_after"]))
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                corps, type_contenu = stub.corps(url.path, ville)
+                if corps is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", type_contenu)
+                self.send_header("Content-Length", str(len(corps)))
+                self.end_headers()
+                try:
+                    self.wfile.write(corps)
+                except ConnectionError:
+                    pass  # Client parti (timeout de lecture dépassé)
+
+            def log_message(self, *args):
+                pass
+
+        self.serveur = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.serveur.daemon_threads = True
+        self._thread = threading.Thread(target=self.serveur.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.serveur.server_port}"
+
+    def panne(self, code=503, nombre=None, proportion=1.0, retry_after=None, latence=0.0):
+        """Dégrade les réponses suivantes.
+
+        ``code`` : statut renvoyé (None pour ne simuler que la latence) ;
+        ``nombre`` : requêtes concernées (None : jusqu'à ``retablir()``) ;
+        ``proportion`` : part des requêtes touchées (tirage reproductible) ;
+        ``retry_after`` : valeur de l'en-tête ``Retry-After`` ;
+        ``latence`` : délai ajouté avant la réponse, en secondes.
+        """
+        with self._lock:
+            self._panne = {"code": code, "restant": nombre, "proportion": proportion,
+                           "retry_after": retry_after, "latence": latence}
+        return self
+
+    def retablir(self):
+        """Fin de la panne simulée"""
+        with self._lock:
+            self._panne = None
+        return self
+
+    def _panne_courante(self):
+        """Panne appliquée à la requête en cours, ou None"""
+        with self._lock:
+            panne = self._panne
+            if panne is None or self._hasard.random() >= panne["proportion"]:
+                return None
+            if panne["restant"] is not None:
+                panne["restant"] -= 1
+                if panne["restant"] <= 0:
+                    self._panne = None
+            if panne["code"]:
+                self.erreurs[panne["code"]] = self.erreurs.get(panne["code"], 0) + 1
+            return dict(panne)
+
+    def ville(self, params):
+        """Ville visée par une requête (par nom ou par coordonnées)"""
+        if "q" in params:
+            return params["q"][0]
+        try:
+            cle = (round(float(params["lat"][0]), 4), round(float(params["lon"][0]), 4))
+        except (KeyError, ValueError):
+            return ""
+        with self._lock:
+            return self._lieux.get(cle, "")
+
+    def corps(self, route, ville):
+        if (route, ville) in self.reponses:
+            return json.dumps(self.reponses[(route, ville)]).encode(), "application/json"
+        if route.endswith("/weather"):
+            return json.dumps(meteo_synthetique(ville)).encode(), "application/json"
+        if route.endswith("/forecast"):
+            return json.dumps(previsions_synthetiques(ville, self.lignes)).encode(), "application/json"
+        if route.endswith("/direct"):
+            lieux = lieu_synthetique(ville)
+            with self._lock:
+                self._lieux[(lieux[0]["lat"], lieux[0]["lon"])] = ville
+            return json.dumps(lieux).encode(), "application/json"
+        if route.endswith("/onecall"):
+            return json.dumps(onecall_synthetique(ville)).encode(), "application/json"
+        if route.startswith("/img/"):
+            return _png_vide(), "image/png"
+        return None, None
+
+    def demarrer(self):
+        self._thread.start()
+        return self
+
+    def arreter(self):
+        self.serveur.shutdown()
+        self.serveur.server_close()
+
+
+def _png_vide():
+    """PNG transparent 1x1 (évite une dépendance à PIL côté bouchon)"""
+    import struct
+    import zlib
+
+    def bloc(type_, data):
+        return struct.pack(">I", len(data)) + type_ + data + struct.pack(">I", zlib.crc32(type_ + data))
+    return (b"\x89PNG\r\n\x1a\n" + bloc(b"IHDR", struct.pack(">IIBBBBB", 1, 1, 8, 6, 0, 0, 0))
+            + bloc(b"IDAT", zlib.compress(b"\x00\x00\x00\x00\x00")) + bloc(b"IEND", b""))
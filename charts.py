@@ -0,0 +1,501 @@
+"""Graphiques météo (onglet « Graphiques »).
+
+La figure matplotlib et son canvas Tk sont créés une seule fois. À chaque
+actualisation, les courbes sont mises à jour avec ``set_data`` et les barres
+de précipitations avec leurs hauteurs ; les axes ne sont recalculés (rendu
+complet) que si leurs limites changent, sinon seules les séries sont
+redessinées par blitting. Le rendu est différé tant que l'onglet n'est pas
+visible, et matplotlib n'est importé qu'au premier rendu.
+
+Les graphiques affichent soit les prévisions, soit une période de
+l'historique (des centaines de milliers de points). Seule la fenêtre visible
+est tracée, décimée à la résolution de l'écran : chaque pixel ne garde que
+le minimum et le maximum de ses points, de sorte que le coût d'un rendu ne
+dépend pas de la longueur de la période. Molette : zoom, glisser : déplacer,
+double-clic : vue complète ; chaque zoom ou déplacement re-décime la fenêtre.
+
+Pendant un geste (glisser, crans de molette rapprochés), seules les séries
+sont redessinées par blitting sur le fond précédent, décimées à une demi
+résolution et sans anticrénelage (la rastérisation des courbes domine le
+coût d'un pas) : graduations, grille et pleine résolution ne reviennent
+(rendu complet) qu'une fois le geste terminé.
+"""
+import time
+import tkinter as tk
+from tkinter import ttk
+
+import numpy as np
+
+from metrics import metrics
+
+# Périodes proposées : None pour les prévisions, sinon jours d'historique
+PERIODES = {
+    "Prévisions 5 jours": None,
+    "Historique 7 jours": 7,
+    "Historique 30 jours": 30,
+    "Historique 90 jours": 90,
+    "Historique 1 an": 365,
+}
+
+# Au-delà de ce nombre de points visibles, les précipitations sont tracées
+# en escalier (un seul artiste) plutôt qu'avec une barre par point
+BARRES_MAX = 200
+
+COURBES = ('temperature', 'ressenti', 'humidite', 'vitesse_vent')
+
+# Rendu complet au relâchement, ou après ce délai sans nouveau cran de molette
+DELAI_RENDU_MS = 200
+
+# Points par pixel pendant un geste (décimation min/max : 2 par tranche)
+RESOLUTION_GESTE = 0.5
+
+
+def _limites_x(x):
+    """Limites de l'axe des dates : toute la plage, avec une petite marge"""
+    marge = max((x[-1] - x[0]) * 0.02, 0.05)
+    return (float(x[0] - marge), float(x[-1] + marge))
+
+
+def _limites_y(actuelles, y_min, y_max):
+    """Limites de l'axe vertical avec hystérésis.
+
+    Les limites actuelles sont conservées tant que les données y tiennent et
+    en occupent une part raisonnable : une petite variation des valeurs ne
+    déclenche donc pas de rendu complet (graduations), seulement un blit.
+    """
+    bas, haut = actuelles
+    etendue = max(float(y_max - y_min), 1.0)
+    if bas <= y_min and y_max <= haut and etendue >= 0.6 * (haut - bas):
+        return actuelles
+    marge = etendue * 0.1
+    bas = float(y_min - marge) if y_min != 0 else 0.0
+    return (bas, float(y_max + marge))
+
+
+def tranches(x, largeur):
+    """Indices de début des ``largeur`` tranches de temps égales de ``x`` (trié).
+
+    Les tranches vides (trous dans l'historique) sont omises.
+    """
+    bornes = np.linspace(x[0], x[-1], largeur + 1)[:-1]
+    return np.unique(np.searchsorted(x, bornes))
+
+
+def _premier_par_tranche(masque, debuts):
+    """Indice du premier élément vrai de chaque tranche"""
+    index = np.flatnonzero(masque)
+    tranche = np.searchsorted(debuts, index, side='right') - 1
+    _, premiers = np.unique(tranche, return_index=True)
+    return index[premiers]
+
+
+def decimer(x, y, debuts):
+    """Décimation min/max : deux points par tranche.
+
+    Chaque tranche est réduite à son minimum et à son maximum, placés à leur
+    date réelle et dans leur ordre d'apparition : les pics restent visibles
+    et la courbe tracée est indiscernable de l'originale à cette résolution.
+    """
+    comptes = np.diff(np.append(debuts, len(x)))
+    minimums = np.repeat(np.fmin.reduceat(y, debuts), comptes)
+    maximums = np.repeat(np.fmax.reduceat(y, debuts), comptes)
+    # Une tranche entièrement NaN garde son premier point
+    vides = np.isnan(minimums)
+    i_min = _premier_par_tranche((y == minimums) | vides, debuts)
+    i_max = _premier_par_tranche((y == maximums) | vides, debuts)
+    index = np.column_stack((np.minimum(i_min, i_max), np.maximum(i_min, i_max))).ravel()
+    return x[index], y[index]
+
+
+def series_previsions(df):
+    """Séries à tracer depuis le DataFrame de ``traiter_previsions``"""
+    import matplotlib.dates as mdates
+
+    series = {nom: df[nom].to_numpy(dtype=np.float64) for nom in COURBES + ('pluie', 'neige')}
+    series['x'] = mdates.date2num(df['date'].to_numpy())
+    return series
+
+
+def series_historique(records):
+    """Séries à tracer depuis des enregistrements de ``HistoryStore.observations``"""
+    import matplotlib.dates as mdates
+
+    from meteo_core import timestamps_locaux
+
+    series = {nom: records[nom].astype(np.float64) for nom in COURBES + ('pluie', 'neige')}
+    series['x'] = mdates.date2num(timestamps_locaux(records['dt']).to_numpy())
+    return series
+
+
+class GraphiquesView:
+    """Les quatre graphiques (température, humidité, vent, précipitations).
+
+    ``historique(debut)`` renvoie les observations de la ville affichée
+    depuis l'instant Unix ``debut``; sans lui, seules les prévisions sont
+    proposées.
+    """
+
+    def __init__(self, parent, historique=None):
+        self.parent = parent
+        self.historique = historique
+        self.visible = False
+        self.fig = None
+        self.canvas = None
+        self._df = None
+        self._source = None
+        self._sale = False
+        self._fond = None
+        self._barres = None
+        self._zoom = False
+        self._glisser = None
+        self._rendu_differe = None  # after() du rendu complet de fin de geste
+
+        # Choix de la période affichée
+        periodes = list(PERIODES) if historique is not None else list(PERIODES)[:1]
+        self.barre = tk.Frame(parent, bg="white")
+        self.barre.pack(fill=tk.X, padx=10, pady=(5, 0))
+        tk.Label(self.barre, text="Période :", bg="white", font=("Arial", 10)).pack(side=tk.LEFT, padx=(0, 2))
+        self.periode_var = tk.StringVar(value=periodes[0])
+        periode_menu = ttk.Combobox(self.barre, textvariable=self.periode_var, values=periodes, width=20, state="readonly")
+        periode_menu.pack(side=tk.LEFT)
+        periode_menu.bind("<<ComboboxSelected>>", self._on_periode)
+        tk.Label(
+            self.barre, text="Molette : zoom · glisser : déplacer · double-clic : vue complète",
+            bg="white", fg="gray", font=("Arial", 9)
+        ).pack(side=tk.RIGHT)
+
+    @property
+    def periode(self):
+        """Jours d'historique affichés (None : prévisions)"""
+        return PERIODES.get(self.periode_var.get())
+
+    def mettre_a_jour(self, df):
+        """Mémorise les nouvelles données; le rendu attend que l'onglet soit visible"""
+        self._df = df
+        self._source = None
+        self._sale = True
+        if self.visible:
+            self.dessiner()
+
+    def set_visible(self, visible):
+        self.visible = visible
+        if visible and self._sale:
+            self.dessiner()
+
+    def _on_periode(self, event=None):
+        """Nouvelle période : recharger les séries et revenir à la vue complète"""
+        self._source = None
+        self._zoom = False
+        self._sale = True
+        if self.visible:
+            self.dessiner()
+
+    def _charger(self):
+        """Séries de la période choisie (prévisions ou historique)"""
+        jours = self.periode
+        if jours is None:
+            return series_previsions(self._df) if self._df is not None else None
+        return series_historique(self.historique(time.time() - jours * 86400))
+
+    def dessiner(self):
+        """Applique les données en attente à la figure persistante"""
+        if self._source is None:
+            self._source = self._charger()
+        if self._source is None:
+            return
+        if self.fig is None:
+            self._construire()
+        self._sale = False
+        if not len(self._source['x']):
+            self._vider()
+            return
+
+        # Un zoom en cours est conservé lors des actualisations
+        plage = self.axs[0, 0].get_xlim() if self._zoom else _limites_x(self._source['x'])
+        self._rafraichir(self._appliquer(plage), immediat=True)
+
+    def _appliquer(self, plage, resolution=1.0):
+        """Trace la fenêtre ``plage`` décimée à la largeur des axes.
+
+        Renvoie True si les limites d'un axe ont changé (rendu complet requis).
+        """
+        with metrics.chrono("graphique", operation="decimation"):
+            return self._appliquer_fenetre(plage, resolution)
+
+    def _appliquer_fenetre(self, plage, resolution):
+        source = self._source
+        x = source['x']
+        debut = max(int(np.searchsorted(x, plage[0])) - 1, 0)
+        fin = min(int(np.searchsorted(x, plage[1], side='right')) + 1, len(x))
+        x = x[debut:fin]
+
+        largeur = max(int(self.axs[0, 0].bbox.width * resolution), 100)
+        debuts = tranches(x, largeur) if len(x) > 2 * largeur else None
+        for ligne, nom in zip(self._lignes, COURBES):
+            y = source[nom][debut:fin]
+            ligne.set_data(*(decimer(x, y, debuts) if debuts is not None else (x, y)))
+
+        pluie, neige = source['pluie'][debut:fin], source['neige'][debut:fin]
+        if len(x) <= BARRES_MAX:
+            self._mettre_a_jour_barres(x, pluie, neige)
+            cumul = pluie + neige
+        else:
+            # Maximum par tranche (ou par point si la fenêtre n'est pas décimée)
+            if debuts is None:
+                debuts = np.arange(len(x))
+            pluie, neige = np.maximum.reduceat(pluie, debuts), np.maximum.reduceat(neige, debuts)
+            self._mettre_a_jour_escaliers(np.append(x[debuts], x[-1]), pluie, neige)
+            cumul = pluie + neige
+
+        temperatures = np.concatenate([self.ligne_temp.get_ydata(), self.ligne_ressenti.get_ydata()])
+        bornes_y = {
+            (0, 0): (np.nanmin(temperatures), np.nanmax(temperatures)),
+            (0, 1): (np.nanmin(self.ligne_humidite.get_ydata()), np.nanmax(self.ligne_humidite.get_ydata())),
+            (1, 0): (np.nanmin(self.ligne_vent.get_ydata()), np.nanmax(self.ligne_vent.get_ydata())),
+            (1, 1): (0, np.nanmax(cumul)),
+        }
+        limites_changees = False
+        plage = (float(plage[0]), float(plage[1]))
+        for position, (y_min, y_max) in bornes_y.items():
+            ax = self.axs[position]
+            limites = (plage, _limites_y(ax.get_ylim(), y_min, y_max))
+            if limites != (ax.get_xlim(), ax.get_ylim()):
+                ax.set_xlim(limites[0])
+                ax.set_ylim(limites[1])
+                limites_changees = True
+        return limites_changees
+
+    def _vider(self):
+        """Aucune donnée sur la période (historique encore vide)"""
+        for ligne in self._lignes:
+            ligne.set_data([], [])
+        for escalier in self._escaliers:
+            escalier.set_visible(False)
+        self._retirer_barres()
+        self.canvas.draw()
+
+    def _rafraichir(self, limites_changees, immediat=False, geste=False):
+        """Rendu complet si les axes ont changé, sinon blit des seules séries.
+
+        Pendant un ``geste``, le rendu complet est reporté à sa fin et les
+        séries sont blittées sur l'ancien fond (graduations momentanément figées).
+        """
+        if geste and self._fond is not None:
+            self._reporter_rendu()
+            self._anticrenelage(False)
+            limites_changees = False
+        if limites_changees or self._fond is None:
+            if immediat:
+                with metrics.chrono("graphique", operation="rendu_complet"):
+                    self.canvas.draw()
+            else:
+                # Les mouvements de souris rapprochés ne donnent qu'un rendu
+                self.canvas.draw_idle()
+        else:
+            with metrics.chrono("graphique", operation="blit"):
+                self.canvas.restore_region(self._fond)
+                self._dessiner_series()
+                self.canvas.blit(self.fig.bbox)
+
+    def _reporter_rendu(self):
+        if self._rendu_differe is not None:
+            self.parent.after_cancel(self._rendu_differe)
+        self._rendu_differe = self.parent.after(DELAI_RENDU_MS, self._rendu_fin_geste)
+
+    def _rendu_fin_geste(self):
+        """Fin de geste : graduations et grille recalculées une seule fois"""
+        if self._rendu_differe is not None:
+            self.parent.after_cancel(self._rendu_differe)
+            self._rendu_differe = None
+        if self.canvas is not None and self._a_donnees():
+            self._anticrenelage(True)
+            self._appliquer(self.axs[0, 0].get_xlim())
+            self.canvas.draw_idle()
+
+    def _anticrenelage(self, actif):
+        for artist in self._series():
+            artist.set_antialiased(actif)
+
+    def _construire(self):
+        """Crée la figure, les axes et les séries (une seule fois)"""
+        import matplotlib.dates as mdates
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+        from matplotlib.patches import Patch
+
+        self.fig = Figure(figsize=(12, 8))
+        self.axs = axs = self.fig.subplots(2, 2)
+        self.fig.tight_layout(pad=4)
+
+        # Graphique Température
+        self.ligne_temp, = axs[0, 0].plot([], [], label='Température (°C)', color='tab:red', animated=True)
+        self.ligne_ressenti, = axs[0, 0].plot([], [], label='Ressenti (°C)', color='tab:orange', linestyle='--', animated=True)
+        axs[0, 0].set_title("Évolution de la température")
+        axs[0, 0].set_xlabel("Date/Heure")
+        axs[0, 0].set_ylabel("Température (°C)")
+        axs[0, 0].legend()
+        axs[0, 0].grid(True)
+
+        # Graphique Humidité
+        self.ligne_humidite, = axs[0, 1].plot([], [], label='Humidité (%)', color='tab:blue', animated=True)
+        axs[0, 1].set_title("Évolution de l'humidité")
+        axs[0, 1].set_xlabel("Date/Heure")
+        axs[0, 1].set_ylabel("Humidité (%)")
+        axs[0, 1].grid(True)
+
+        # Graphique Vent
+        self.ligne_vent, = axs[1, 0].plot([], [], label='Vitesse du vent (m/s)', color='tab:green', animated=True)
+        axs[1, 0].set_title("Vitesse du vent")
+        axs[1, 0].set_xlabel("Date/Heure")
+        axs[1, 0].set_ylabel("Vitesse (m/s)")
+        axs[1, 0].grid(True)
+
+        # Même ordre que COURBES
+        self._lignes = (self.ligne_temp, self.ligne_ressenti, self.ligne_humidite, self.ligne_vent)
+
+        # Graphique Pluie/Neige : barres créées à la première mise à jour,
+        # escaliers (cumul, pluie) pour les longues périodes
+        axs[1, 1].set_title("Précipitations")
+        axs[1, 1].set_xlabel("Date/Heure")
+        axs[1, 1].set_ylabel("Quantité (mm)")
+        axs[1, 1].legend(handles=[
+            Patch(color='tab:cyan', label='Pluie (mm)'),
+            Patch(color='tab:gray', label='Neige (mm)'),
+        ])
+        axs[1, 1].grid(True)
+        self._escaliers = (
+            axs[1, 1].stairs([0], [0, 1], fill=True, color='tab:gray', animated=True, visible=False),
+            axs[1, 1].stairs([0], [0, 1], fill=True, color='tab:cyan', animated=True, visible=False),
+        )
+
+        # Graduations de dates lisibles de l'heure à l'année (zoom)
+        for ax in axs.flat:
+            ax.xaxis_date()
+            localisateur = mdates.AutoDateLocator()
+            ax.xaxis.set_major_locator(localisateur)
+            ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(localisateur))
+
+        # Embedding de la figure matplotlib dans Tkinter
+        self.canvas = FigureCanvasTkAgg(self.fig, master=self.parent)
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+
+        # Zoom / déplacement sur l'axe du temps
+        self.canvas.mpl_connect('scroll_event', self._on_molette)
+        self.canvas.mpl_connect('button_press_event', self._on_clic)
+        self.canvas.mpl_connect('motion_notify_event', self._on_glisser)
+        self.canvas.mpl_connect('button_release_event', self._on_relacher)
+
+    def _mettre_a_jour_barres(self, x, pluie, neige):
+        """Met à jour les hauteurs; recrée les barres seulement si leur nombre change"""
+        for escalier in self._escaliers:
+            escalier.set_visible(False)
+        if self._barres is not None and len(self._barres[0]) == len(x):
+            barres_pluie, barres_neige = self._barres
+            for rect_pluie, rect_neige, xi, p, n in zip(barres_pluie, barres_neige, x, pluie, neige):
+                rect_pluie.set_x(xi - rect_pluie.get_width() / 2)
+                rect_pluie.set_height(p)
+                rect_neige.set_x(xi - rect_neige.get_width() / 2)
+                rect_neige.set_y(p)
+                rect_neige.set_height(n)
+            return
+
+        self._retirer_barres()
+        # Largeur proportionnelle au pas des données (3 h pour les prévisions)
+        pas = float(np.median(np.diff(x))) if len(x) > 1 else 0.125
+        ax = self.axs[1, 1]
+        barres_pluie = ax.bar(x, pluie, width=pas * 0.8, color='tab:cyan', animated=True)
+        barres_neige = ax.bar(x, neige, width=pas * 0.8, color='tab:gray', bottom=pluie, animated=True)
+        self._barres = (barres_pluie, barres_neige)
+
+    def _mettre_a_jour_escaliers(self, bords, pluie, neige):
+        """Précipitations en escalier : un artiste par série quel que soit le nombre de points"""
+        self._retirer_barres()
+        # Cumul pluie + neige en gris, pluie par-dessus : neige empilée sur la pluie
+        escalier_cumul, escalier_pluie = self._escaliers
+        escalier_cumul.set_data(pluie + neige, bords)
+        escalier_pluie.set_data(pluie, bords)
+        for escalier in self._escaliers:
+            escalier.set_visible(True)
+
+    def _retirer_barres(self):
+        if self._barres is not None:
+            for conteneur in self._barres:
+                conteneur.remove()
+            self._barres = None
+
+    def _series(self):
+        yield from self._lignes
+        yield from self._escaliers
+        if self._barres is not None:
+            for conteneur in self._barres:
+                yield from conteneur
+
+    def _dessiner_series(self):
+        for artist in self._series():
+            artist.axes.draw_artist(artist)
+
+    def _on_draw(self, event):
+        """Après un rendu complet : mémoriser le fond puis dessiner les séries"""
+        self._fond = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._dessiner_series()
+
+    # --- Zoom / déplacement (axe du temps uniquement) ---
+
+    def _a_donnees(self):
+        return self._source is not None and len(self._source['x']) > 0
+
+    def _deplacer(self, plage):
+        """Affiche la fenêtre ``plage``, re-décimée, bornée aux données"""
+        x = self._source['x']
+        complete = _limites_x(x)
+        largeur = min(plage[1] - plage[0], complete[1] - complete[0])
+        # Zoom maximal : une heure
+        largeur = max(largeur, 1 / 24)
+        debut = min(max(plage[0], complete[0]), complete[1] - largeur)
+        self._zoom = True
+        geste = self._fond is not None
+        self._rafraichir(self._appliquer((debut, debut + largeur), RESOLUTION_GESTE if geste else 1.0), geste=geste)
+
+    def _on_molette(self, event):
+        if event.inaxes is None or not self._a_donnees():
+            return
+        facteur = 0.8 if event.button == 'up' else 1.25
+        bas, haut = event.inaxes.get_xlim()
+        centre = event.xdata
+        self._deplacer((centre - (centre - bas) * facteur, centre + (haut - centre) * facteur))
+
+    def _on_clic(self, event):
+        if event.inaxes is None or not self._a_donnees() or event.button != 1:
+            return
+        if event.dblclick:
+            self._glisser = None
+            self._zoom = False
+            self._rafraichir(self._appliquer(_limites_x(self._source['x'])))
+            return
+        self._glisser = (event.x, event.inaxes.get_xlim(), event.inaxes.bbox.width)
+
+    def _on_glisser(self, event):
+        if self._glisser is None:
+            return
+        x_depart, (bas, haut), largeur_pixels = self._glisser
+        decalage = (event.x - x_depart) * (haut - bas) / largeur_pixels
+        self._deplacer((bas - decalage, haut - decalage))
+
+    def _on_relacher(self, event):
+        if self._glisser is not None and self._rendu_differe is not None:
+            self._rendu_fin_geste()
+        self._glisser = None
+
+    def fermer(self):
+        """Libère la figure (aucune figure pyplot n'est créée)"""
+        if self._rendu_differe is not None:
+            self.parent.after_cancel(self._rendu_differe)
+            self._rendu_differe = None
+        if self.fig is not None:
+            self.fig.clear()
+            self.canvas.get_tk_widget().destroy()
+            self.fig = self.canvas = None
+            self._fond = None
+            self._barres = None
+            self._sale = self._source is not None or self._df is not None
@@ -0,0 +1,133 @@
+"""Moteur de récupération en arrière-plan pour l'application météo.
+
+Les appels réseau sont exécutés dans un pool de threads ; les résultats sont
+remis au thread Tk via ``root.after`` afin que l'interface ne se fige jamais
+pendant un aller-retour réseau.
+"""
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class _Job:
+    """Un lot de tâches lancées ensemble (ex. météo actuelle + prévisions)"""
+
+    def __init__(self, generation, noms, callback, on_tache=None):
+        self.generation = generation
+        self.callback = callback
+        self.on_tache = on_tache
+        self.resultats = {}
+        self.erreurs = {}
+        self.futures = []
+        self._restantes = set(noms)
+        self._lock = threading.Lock()
+
+    def terminer(self, nom, future):
+        """Enregistre le résultat d'une tâche; renvoie True quand le lot est complet"""
+        with self._lock:
+            try:
+                self.resultats[nom] = future.result()
+            except Exception as e:
+                self.erreurs[nom] = e
+            self._restantes.discard(nom)
+            return not self._restantes
+
+
+class FetchEngine:
+    """Exécute les tâches réseau en parallèle, hors du thread Tk"""
+
+    def __init__(self, root, max_workers=4, poll_interval=50):
+        self.root = root
+        self.poll_interval = poll_interval
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="meteo-fetch")
+        self._termines = queue.Queue()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._en_cours = []
+        self._poll_job = None
+
+    @property
+    def en_cours(self):
+        """True si un lot de tâches est encore en attente de résultat"""
+        return bool(self._en_cours)
+
+    def submit(self, taches, callback, on_tache=None):
+        """Lance toutes les tâches de ``taches`` (nom -> callable) en même temps.
+
+        Le nombre de tâches réellement simultanées est borné par la taille du
+        pool. ``callback(resultats, erreurs)`` est appelé sur le thread Tk une
+        fois toutes les tâches terminées; ``on_tache(nom, resultat, erreur)``,
+        s'il est fourni, l'est au fil de l'eau pour chaque tâche. Un nouvel
+        appel annule le lot précédent : ses réponses, si elles arrivent quand
+        même, sont ignorées.
+        """
+        self.cancel()
+        with self._lock:
+            job = _Job(self._generation, taches.keys(), callback, on_tache)
+            self._en_cours.append(job)
+        if not taches:
+            self._termines.put((job, None))
+        for nom, fn in taches.items():
+            future = self._executor.submit(fn)
+            job.futures.append(future)
+            future.add_done_callback(lambda f, nom=nom: self._tache_terminee(job, nom, f))
+        self._demarrer_polling()
+        return job
+
+    def cancel(self):
+        """Annule les lots en cours; leurs résultats tardifs seront ignorés"""
+        with self._lock:
+            self._generation += 1
+            jobs, self._en_cours = self._en_cours, []
+        for job in jobs:
+            for future in job.futures:
+                future.cancel()
+
+    def shutdown(self):
+        """Arrête le pool de threads sans attendre les requêtes en vol"""
+        self.cancel()
+        if self._poll_job is not None:
+            try:
+                self.root.after_cancel(self._poll_job)
+            except Exception:
+                pass
+            self._poll_job = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _tache_terminee(self, job, nom, future):
+        # Appelé depuis un thread du pool : aucun accès à Tk ici
+        if future.cancelled():
+            return
+        complet = job.terminer(nom, future)
+        if job.on_tache is not None:
+            self._termines.put((job, nom))
+        if complet:
+            self._termines.put((job, None))
+
+    def _demarrer_polling(self):
+        if self._poll_job is None:
+            self._poll_job = self.root.after(self.poll_interval, self._poll)
+
+    def _poll(self):
+        """Vide la file des lots terminés sur le thread Tk"""
+        self._poll_job = None
+        while True:
+            try:
+                job, nom = self._termines.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                obsolete = job.generation != self._generation
+                if nom is None and job in self._en_cours:
+                    self._en_cours.remove(job)
+            if obsolete:
+                continue
+            try:
+                if nom is not None:
+                    job.on_tache(nom, job.resultats.get(nom), job.erreurs.get(nom))
+                else:
+                    job.callback(job.resultats, job.erreurs)
+            except Exception as e:
+                print(f"Erreur lors du traitement des données reçues: {e}")
+        if self._en_cours:
+            self._demarrer_polling()
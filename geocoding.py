@@ -0,0 +1,164 @@
+"""Géocodage des villes (nom -> coordonnées), avec cache persistant.
+
+Une ville n'est résolue qu'une fois par l'API de géocodage
+d'OpenWeatherMap; les requêtes météo se font ensuite par latitude et
+longitude. Les clés du cache sont normalisées (casse, accents, espaces,
+tirets) : « Saint-Étienne », « saint etienne » et « SAINT-ETIENNE , FR »
+désignent la même entrée. Seule une clé identique est servie par le cache :
+un nom proche (« Saint-Genis » / « Saint-Denis ») ou sans code pays
+(« Paris » / « Paris,US ») peut être une autre ville, il est donc demandé à
+l'API.
+
+En mode serveur, n'importe quel nom envoyé par un client peut arriver ici :
+les villes résolues (``MAX_LIEUX``) et inconnues (``MAX_INCONNUES``) sont
+gardées en LRU, et les sauvegardes du cache sont regroupées comme celles du
+cache des réponses.
+"""
+import atexit
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+
+from app_paths import cache_dir
+from keyed_lock import KeyedLock
+
+GEO_URL = "https://api.openweathermap.org/geo/1.0"
+
+# Nombre maximal de villes mémorisées (les moins récemment demandées sont oubliées)
+MAX_LIEUX = 2000
+MAX_INCONNUES = 1000
+
+# Délai de regroupement des écritures disque, en secondes
+DELAI_SAUVEGARDE = 2.0
+
+
+def normaliser(ville):
+    """Clé de cache d'un nom de ville : minuscules, sans accents ni ponctuation superflue"""
+    texte = unicodedata.normalize("NFKD", ville.casefold())
+    texte = "".join(c for c in texte if not unicodedata.combining(c))
+    parties = [re.sub(r"[\s\-'’.]+", " ", partie).strip() for partie in texte.split(",")]
+    return ",".join(partie for partie in parties if partie)
+
+
+class Geocodeur:
+    """Résout et mémorise les coordonnées des villes"""
+
+    def __init__(self, client, base_url=GEO_URL, chemin=None):
+        self.client = client
+        self.base_url = base_url.rstrip("/")
+        self.chemin = chemin or os.path.join(cache_dir(), "geocodage.json")
+        self.requetes = 0  # Appels à l'API de géocodage
+        self._lieux = OrderedDict()  # clé normalisée -> {"nom", "pays", "lat", "lon"}
+        self._inconnues = OrderedDict()  # clé normalisée -> None
+        self._lock = threading.Lock()
+        self._ecriture = threading.Lock()  # Sérialise les écritures du fichier
+        self._minuteur = None  # Sauvegarde différée en attente
+        self._resolutions = KeyedLock()  # Une résolution à la fois par ville
+        self._charger()
+        atexit.register(self._sauver_en_attente)
+
+    def resoudre(self, ville):
+        """Coordonnées et nom officiel d'une ville, ou None si elle est introuvable.
+
+        Renvoie un dict {"nom", "pays", "lat", "lon"}.
+        """
+        cle = normaliser(ville)
+        if not cle:
+            return None
+        with self._lock:
+            if cle in self._inconnues:
+                return None
+        lieu = self._chercher(cle)
+        if lieu is not None:
+            return lieu
+
+        # Des demandes simultanées pour la même ville (météo et prévisions)
+        # ne font qu'un appel; les autres villes sont résolues en parallèle
+        with self._resolutions.verrou(cle):
+            lieu = self._chercher(cle)
+            if lieu is None:
+                lieu = self._interroger(ville, cle)
+        return lieu
+
+    def _interroger(self, ville, cle):
+        with self._lock:
+            self.requetes += 1
+        status_code, data = self.client.requete(
+            "direct", {"q": ville, "limit": 1}, base_url=self.base_url, en_cache=False
+        )
+        # Liste vide : ville inconnue (les requêtes se feront par nom), pas
+        # redemandée avant le prochain lancement
+        if status_code != 200 or not isinstance(data, list) or not data:
+            if status_code == 200:
+                with self._lock:
+                    self._inconnues[cle] = None
+                    self._borner(self._inconnues, MAX_INCONNUES)
+            return None
+        resultat = data[0]
+        lieu = {
+            "nom": resultat.get("local_names", {}).get("fr", resultat["name"]),
+            "pays": resultat.get("country", ""),
+            # 4 décimales (~10 m) : des clés de cache de réponses stables
+            "lat": round(float(resultat["lat"]), 4),
+            "lon": round(float(resultat["lon"]), 4),
+        }
+        with self._lock:
+            self._lieux[cle] = lieu
+            # Le nom officiel sert aussi de clé (ex. « paris,fr » pour « Paris »)
+            self._lieux.setdefault(normaliser(f"{lieu['nom']},{lieu['pays']}"), lieu)
+            self._borner(self._lieux, MAX_LIEUX)
+        self._planifier()
+        return lieu
+
+    def _chercher(self, cle):
+        with self._lock:
+            lieu = self._lieux.get(cle)
+            if lieu is not None:
+                self._lieux.move_to_end(cle)
+            return lieu
+
+    @staticmethod
+    def _borner(entrees, maximum):
+        """Oublie les entrées les moins récemment utilisées (verrou tenu)"""
+        while len(entrees) > maximum:
+            entrees.popitem(last=False)
+
+    def sauver(self):
+        """Écrit le cache sur disque (écriture atomique)"""
+        with self._ecriture:
+            with self._lock:
+                if self._minuteur is not None:
+                    self._minuteur.cancel()
+                    self._minuteur = None
+                lieux = dict(self._lieux)
+            contenu = json.dumps(lieux, ensure_ascii=False)
+            tmp = f"{self.chemin}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.write(contenu)
+                os.replace(tmp, self.chemin)
+            except OSError as e:
+                print(f"Erreur lors de la sauvegarde du géocodage: {e}")
+
+    def _planifier(self):
+        """Programme une sauvegarde (les résolutions rapprochées n'en font qu'une)"""
+        with self._lock:
+            if self._minuteur is None:
+                self._minuteur = threading.Timer(DELAI_SAUVEGARDE, self.sauver)
+                self._minuteur.daemon = True
+                self._minuteur.start()
+
+    def _sauver_en_attente(self):
+        if self._minuteur is not None:
+            self.sauver()
+
+    def _charger(self):
+        try:
+            with open(self.chemin, encoding="utf-8") as f:
+                self._lieux = OrderedDict(json.load(f))
+        except (OSError, ValueError):
+            self._lieux = OrderedDict()
+        self._borner(self._lieux, MAX_LIEUX)
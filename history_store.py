@@ -0,0 +1,239 @@
+"""Historique des observations et des prévisions récupérées.
+
+Stockage colonnaire compact en ajout seul : un fichier d'enregistrements
+binaires de taille fixe (dtype NumPy) par ville, par type (observations ou
+prévisions) et par mois. Les lectures passent par ``np.memmap`` et ne
+chargent que les partitions couvrant la plage demandée.
+
+Les écritures sont mises en file et regroupées par un thread dédié : le
+chemin d'actualisation ne fait jamais d'entrée/sortie disque.
+"""
+import glob
+import hashlib
+import os
+import queue
+import re
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from app_paths import cache_dir
+
+# Un enregistrement : instant visé (dt) et instant d'émission (emis) en
+# secondes Unix; pour une observation, emis == dt
+RECORD = np.dtype([
+    ('dt', '<i8'),
+    ('emis', '<i8'),
+    ('temperature', '<f4'),
+    ('ressenti', '<f4'),
+    ('humidite', '<i2'),
+    ('pression', '<i2'),
+    ('vitesse_vent', '<f4'),
+    ('direction_vent', '<i2'),
+    ('pluie', '<f4'),
+    ('neige', '<f4'),
+    ('icon', 'S3'),
+])
+
+OBSERVATIONS = "observations"
+PREVISIONS = "previsions"
+
+
+def _slug(ville):
+    """Nom de dossier stable pour une ville (normalisé + empreinte courte)"""
+    normalise = ville.strip().lower()
+    lisible = re.sub(r"[^a-z0-9]+", "_", normalise).strip("_")[:40]
+    return f"{lisible}-{hashlib.sha1(normalise.encode()).hexdigest()[:8]}"
+
+
+def _mois(ts):
+    return datetime.fromtimestamp(int(ts), timezone.utc).strftime("%Y-%m")
+
+
+def _enregistrement(dt, emis, main, vent, meteo, pluie, neige):
+    return (dt, emis, main['temp'], main['feels_like'], main['humidity'], main['pressure'],
+            vent['speed'], vent.get('deg', 0), pluie, neige, meteo['icon'].encode()[:3])
+
+
+def observation_en_records(meteo):
+    """Réponse /weather -> tableau d'un enregistrement"""
+    dt = meteo['dt']
+    return np.array([_enregistrement(
+        dt, dt, meteo['main'], meteo['wind'], meteo['weather'][0],
+        meteo.get('rain', {}).get('1h', 0), meteo.get('snow', {}).get('1h', 0),
+    )], dtype=RECORD)
+
+
+def previsions_en_records(previsions, emis):
+    """Réponse /forecast -> un enregistrement par créneau, émis à ``emis``"""
+    return np.array([
+        _enregistrement(
+            p['dt'], emis, p['main'], p['wind'], p['weather'][0],
+            p.get('rain', {}).get('3h', 0), p.get('snow', {}).get('3h', 0),
+        )
+        for p in previsions['list']
+    ], dtype=RECORD)
+
+
+class HistoryStore:
+    """Historique en ajout seul, partitionné par ville / type / mois"""
+
+    def __init__(self, dossier=None, intervalle_ecriture=5.0, taille_lot=500):
+        self.dossier = dossier or cache_dir("history")
+        self.intervalle_ecriture = intervalle_ecriture
+        self.taille_lot = taille_lot
+        self._file = queue.Queue()
+        self._derniers = {}  # (ville, type) -> dt/emis du dernier ajout (dédoublonnage)
+        # Verrou propre au dédoublonnage : un ajout depuis le thread Tk
+        # n'attend jamais un lot d'écriture ni une lecture de l'historique
+        self._derniers_lock = threading.Lock()
+        self._lock = threading.Lock()  # Sérialise écritures disque et lectures
+        self._thread = threading.Thread(target=self._ecrivain, name="meteo-history", daemon=True)
+        self._thread.start()
+
+    # --- Écriture (non bloquante) ---
+
+    def ajouter_observation(self, ville, meteo):
+        """Met en file une observation (ignorée si déjà enregistrée)"""
+        if meteo and self._nouveau(ville, OBSERVATIONS, meteo['dt']):
+            self._file.put((ville, OBSERVATIONS, meteo))
+
+    def ajouter_previsions(self, ville, previsions, emis=None):
+        """Met en file un instantané de prévisions émis à ``emis`` (maintenant par défaut)"""
+        if not previsions:
+            return
+        # Un même jeu de prévisions (même premier créneau) n'est stocké qu'une fois
+        if self._nouveau(ville, PREVISIONS, previsions['list'][0]['dt']):
+            self._file.put((ville, PREVISIONS, (previsions, int(emis or time.time()))))
+
+    def flush(self):
+        """Attend que toutes les écritures en file soient sur disque"""
+        self._file.join()
+
+    def fermer(self):
+        self._file.put(None)
+        self._thread.join(timeout=10)
+
+    def _nouveau(self, ville, type_, cle):
+        with self._derniers_lock:
+            if self._derniers.get((ville, type_)) == cle:
+                return False
+            self._derniers[(ville, type_)] = cle
+            return True
+
+    def _ecrivain(self):
+        """Thread d'écriture : regroupe les ajouts reçus pendant ``intervalle_ecriture``"""
+        while True:
+            lot = [self._file.get()]
+            limite = time.monotonic() + self.intervalle_ecriture
+            while lot[-1] is not None and len(lot) < self.taille_lot:
+                reste = limite - time.monotonic()
+                if reste <= 0:
+                    break
+                try:
+                    lot.append(self._file.get(timeout=reste))
+                except queue.Empty:
+                    break
+            try:
+                self._ecrire([element for element in lot if element is not None])
+            except Exception as e:
+                print(f"Erreur lors de l'écriture de l'historique: {e}")
+            for _ in lot:
+                self._file.task_done()
+            if lot[-1] is None:
+                return
+
+    def _ecrire(self, lot):
+        if not lot:
+            return
+        partitions = {}
+        for ville, type_, donnees in lot:
+            if type_ == OBSERVATIONS:
+                records = observation_en_records(donnees)
+            else:
+                previsions, emis = donnees
+                records = previsions_en_records(previsions, emis)
+            cle_tri = records['dt'] if type_ == OBSERVATIONS else records['emis']
+            for mois in np.unique([_mois(t) for t in cle_tri]):
+                masque = np.array([_mois(t) == mois for t in cle_tri])
+                partitions.setdefault((ville, type_, mois), []).append(records[masque])
+
+        with self._lock:
+            for (ville, type_, mois), morceaux in partitions.items():
+                dossier = os.path.join(self.dossier, _slug(ville))
+                os.makedirs(dossier, exist_ok=True)
+                with open(os.path.join(dossier, f"{type_}-{mois}.bin"), "ab") as f:
+                    f.write(np.concatenate(morceaux).tobytes())
+
+    # --- Lecture ---
+
+    def _partitions(self, ville, type_, debut, fin):
+        dossier = os.path.join(self.dossier, _slug(ville))
+        chemins = sorted(glob.glob(os.path.join(dossier, f"{type_}-*.bin")))
+        mois_debut, mois_fin = _mois(debut), _mois(fin)
+        for chemin in chemins:
+            mois = os.path.basename(chemin)[len(type_) + 1:-4]
+            if mois_debut <= mois <= mois_fin:
+                yield chemin
+
+    def _lire(self, ville, type_, debut, fin, champ):
+        morceaux = []
+        with self._lock:
+            for chemin in self._partitions(ville, type_, debut, fin):
+                n = os.path.getsize(chemin) // RECORD.itemsize
+                if n == 0:
+                    continue
+                # Un enregistrement partiel en fin de fichier (arrêt brutal) est ignoré
+                records = np.memmap(chemin, dtype=RECORD, mode="r", shape=(n,))
+                masque = (records[champ] >= debut) & (records[champ] <= fin)
+                morceaux.append(np.array(records[masque]))
+        if not morceaux:
+            return np.empty(0, dtype=RECORD)
+        return np.concatenate(morceaux)
+
+    def observations(self, ville, debut, fin=None):
+        """Observations de ``ville`` entre deux instants Unix, triées par date"""
+        records = self._lire(ville, OBSERVATIONS, int(debut), int(fin or time.time()), 'dt')
+        # Triées par date, sans doublons (ex. même observation après un redémarrage)
+        _, index = np.unique(records['dt'], return_index=True)
+        return records[index]
+
+    def previsions(self, ville, debut, fin=None):
+        """Instantanés de prévisions émis entre deux instants Unix"""
+        records = self._lire(ville, PREVISIONS, int(debut), int(fin or time.time()), 'emis')
+        return records[np.lexsort((records['dt'], records['emis']))]
+
+    def derniers_jours(self, ville, jours=30):
+        """Observations des ``jours`` derniers jours"""
+        return self.observations(ville, time.time() - jours * 86400)
+
+    def comparer_previsions(self, ville, debut, fin=None, tolerance=5400):
+        """Compare chaque créneau prévu à l'observation la plus proche.
+
+        Renvoie un DataFrame (dt, emis, echeance_h, prevu, observe, erreur) pour
+        les créneaux visés entre ``debut`` et ``fin``; une observation n'est
+        retenue que si elle est à moins de ``tolerance`` secondes du créneau.
+        """
+        import pandas as pd
+
+        fin = int(fin or time.time())
+        # Les prévisions visant la plage ont pu être émises jusqu'à 5 jours avant
+        previsions = self.previsions(ville, int(debut) - 6 * 86400, fin)
+        previsions = previsions[(previsions['dt'] >= debut) & (previsions['dt'] <= fin)]
+        observations = self.observations(ville, int(debut) - tolerance, fin + tolerance)
+
+        prevu = pd.DataFrame({
+            'dt': previsions['dt'], 'emis': previsions['emis'],
+            'prevu': previsions['temperature'].astype(np.float64),
+        }).sort_values('dt')
+        observe = pd.DataFrame({
+            'dt_obs': observations['dt'], 'observe': observations['temperature'].astype(np.float64),
+        })
+        df = pd.merge_asof(prevu, observe, left_on='dt', right_on='dt_obs',
+                           direction='nearest', tolerance=tolerance)
+        df = df.dropna(subset=['observe'])
+        df['echeance_h'] = (df['dt'] - df['emis']) / 3600
+        df['erreur'] = df['prevu'] - df['observe']
+        return df[['dt', 'emis', 'echeance_h', 'prevu', 'observe', 'erreur']].reset_index(drop=True)
@@ -0,0 +1,196 @@
+"""Cache des icônes OpenWeatherMap.
+
+Trois niveaux :
+- sur disque, les PNG bruts téléchargés (un fichier par code et variante),
+  pour qu'un démarrage à froid ne touche pas le réseau ;
+- un atlas des images déjà décodées et mises à la taille d'affichage, une
+  par (code, taille), préparé sur un thread de travail (au démarrage pour
+  les icônes déjà sur disque, puis avec chaque récupération de données) ;
+- les ``ImageTk.PhotoImage`` partagées, une par (code, taille), créées au
+  premier affichage à partir de l'atlas.
+
+Le rendu d'une actualisation ne décode ni ne rééchantillonne donc aucune
+image sur le thread Tk, et n'y fait jamais d'appel réseau : ``photo()``
+renvoie None pour une icône ni dans l'atlas ni sur disque, à l'appelant de
+la faire préparer par ``image()`` sur un thread de travail. Les codes
+d'icônes sont en nombre fini (voir ``CODES``) et tout autre code est refusé
+(LookupError) : l'atlas et les PhotoImage restent bornés sans éviction.
+"""
+import io
+import os
+import threading
+import time
+import urllib.request
+
+from app_paths import cache_dir
+from metrics import metrics
+
+ICON_URL = "http://openweathermap.org/img/wn/{code}{variante}.png"
+
+# Tous les codes d'icônes de l'API (conditions, jour / nuit)
+CODES = tuple(f"{numero}{moment}" for numero in ("01", "02", "03", "04", "09", "10", "11", "13", "50")
+              for moment in "dn")
+
+# Tailles affichées par l'application (prévisions, météo actuelle)
+TAILLES = (50, 100)
+
+# Une icône introuvable n'est pas redemandée avant ce délai (secondes)
+DELAI_ECHEC = 300
+
+
+def _telecharger(url):
+    with urllib.request.urlopen(url) as u:
+        return u.read()
+
+
+def _verifier(code):
+    """Refuse un code d'icône hors de ``CODES`` (l'atlas resterait sinon sans borne)"""
+    if code not in CODES:
+        raise LookupError(f"code d'icône inconnu : {code!r}")
+
+
+def variante_pour(taille):
+    """Choisit la variante source (@2x pour les grandes icônes)"""
+    return "@2x" if taille > 50 else ""
+
+
+class IconCache:
+    """Cache disque + atlas d'images prêtes à afficher des icônes météo"""
+
+    def __init__(self, dossier=None, telecharger=None):
+        self.dossier = dossier or cache_dir("icons")
+        self.telecharger = telecharger or _telecharger
+        self.requetes = 0  # Nombre de téléchargements effectués
+        self._images = {}  # (code, taille) -> PIL.Image décodée et redimensionnée
+        self._photos = {}  # (code, taille) -> ImageTk.PhotoImage partagée
+        self._echecs = {}  # (code, variante) -> instant du dernier échec
+        self._lock = threading.Lock()
+
+    def _chemin(self, code, variante):
+        return os.path.join(self.dossier, f"{code}{variante}.png")
+
+    def brut(self, code, variante="", reseau=True):
+        """Renvoie les octets PNG de l'icône (disque, sinon réseau).
+
+        Utilisable depuis n'importe quel thread. Après un échec de
+        téléchargement, l'icône n'est pas redemandée avant ``DELAI_ECHEC``.
+        Sans ``reseau``, une icône absente du disque lève LookupError.
+        """
+        chemin = self._chemin(code, variante)
+        try:
+            with open(chemin, "rb") as f:
+                data = f.read()
+            metrics.compter("icones", source="disque")
+            return data
+        except OSError:
+            if not reseau:
+                raise LookupError(f"icône {code}{variante} absente du disque")
+
+        with self._lock:
+            echec = self._echecs.get((code, variante))
+        if echec is not None and time.monotonic() - echec < DELAI_ECHEC:
+            raise LookupError(f"icône {code}{variante} indisponible (échec récent)")
+
+        metrics.compter("icones", source="reseau")
+        try:
+            with metrics.chrono("icone", operation="telechargement"):
+                data = self.telecharger(ICON_URL.format(code=code, variante=variante))
+        except Exception:
+            with self._lock:
+                self._echecs[(code, variante)] = time.monotonic()
+            raise
+        with self._lock:
+            self.requetes += 1
+            self._echecs.pop((code, variante), None)
+        # Écriture atomique pour ne jamais laisser un PNG tronqué sur disque
+        tmp = f"{chemin}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, chemin)
+        return data
+
+    def sur_disque(self, code, variante=""):
+        """Octets PNG de l'icône si elle est déjà sur disque, sinon None (sans réseau)"""
+        try:
+            with open(self._chemin(code, variante), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def importer(self, icones):
+        """Remet sur disque les icônes (code, variante, octets) qui y manquent"""
+        for code, variante, data in icones:
+            chemin = self._chemin(code, variante)
+            if os.path.exists(chemin):
+                continue
+            tmp = f"{chemin}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, chemin)
+            except OSError as e:
+                print(f"Erreur lors de l'import de l'icône: {e}")
+
+    def image(self, code, taille, reseau=True):
+        """Image ``taille``x``taille`` de l'atlas, décodée au besoin (tout thread).
+
+        Un code hors de ``CODES`` lève LookupError.
+        """
+        _verifier(code)
+        cle = (code, taille)
+        with self._lock:
+            img = self._images.get(cle)
+        if img is not None:
+            return img
+
+        from PIL import Image
+        data = self.brut(code, variante_pour(taille), reseau)
+        with metrics.chrono("icone", operation="decodage"):
+            img = Image.open(io.BytesIO(data))
+            img.load()
+        # Les PNG de l'API font déjà 50 px (100 px en @2x) : pas de
+        # rééchantillonnage quand la taille correspond
+        if img.size != (taille, taille):
+            with metrics.chrono("icone", operation="redimensionnement"):
+                img = img.resize((taille, taille), Image.LANCZOS)
+        with self._lock:
+            return self._images.setdefault(cle, img)
+
+    def prefetch(self, codes, taille, reseau=True):
+        """Prépare à l'avance les icônes de ``codes`` dans l'atlas (thread de travail).
+
+        Sans ``reseau``, seules celles déjà sur disque sont préparées.
+        """
+        for code in set(codes):
+            try:
+                self.image(code, taille, reseau)
+            except Exception as e:
+                if reseau or not isinstance(e, LookupError):
+                    print(f"Erreur lors du chargement de l'icône: {e}")
+
+    def precharger(self, tailles=TAILLES):
+        """Remplit l'atlas avec les icônes déjà sur disque (thread de travail, sans réseau)"""
+        for taille in tailles:
+            variante = variante_pour(taille)
+            self.prefetch([code for code in CODES if os.path.exists(self._chemin(code, variante))], taille, reseau=False)
+
+    def photo(self, code, taille):
+        """PhotoImage ``taille``x``taille`` partagée (thread Tk, sans réseau).
+
+        None si l'icône n'est ni dans l'atlas ni sur disque; un code hors de
+        ``CODES`` lève LookupError.
+        """
+        _verifier(code)
+        cle = (code, taille)
+        photo = self._photos.get(cle)
+        if photo is not None:
+            metrics.compter("icones", source="memoire")
+            return photo
+
+        try:
+            img = self.image(code, taille, reseau=False)
+        except LookupError:
+            return None
+        from PIL import ImageTk
+        photo = self._photos[cle] = ImageTk.PhotoImage(img)
+        return photo
@@ -0,0 +1,37 @@
+"""Verrous par clé, pour ne regrouper que les appels concurrents identiques.
+
+Deux demandes simultanées pour la même clé (ex. météo et prévisions d'une
+même ville) s'attendent; des clés différentes ne se bloquent jamais. Le
+verrou d'une clé est oublié dès que plus aucun thread ne le tient ni ne
+l'attend : la table reste bornée par le nombre d'appels en cours, quel que
+soit le nombre de clés vues.
+"""
+import threading
+from contextlib import contextmanager
+
+
+class KeyedLock:
+    """Un verrou par clé, créé à la demande et libéré après usage"""
+
+    def __init__(self):
+        self._verrous = {}  # clé -> [verrou, threads qui le tiennent ou l'attendent]
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def verrou(self, cle):
+        """Tient le verrou de ``cle`` le temps du bloc ``with``"""
+        with self._lock:
+            entree = self._verrous.setdefault(cle, [threading.Lock(), 0])
+            entree[1] += 1
+        try:
+            with entree[0]:
+                yield
+        finally:
+            with self._lock:
+                entree[1] -= 1
+                if not entree[1]:
+                    del self._verrous[cle]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._verrous)
@@ -1,23 +1,27 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import requests
-import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import numpy as np
 from datetime import datetime
-from PIL import Image, ImageTk
-import io
-import urllib.request
-import os
-import dotenv
+import logging
+import threading
+import time
 import sys
+from operator import itemgetter
 
-# API settings
-dotenv.load_dotenv()
+from api_client import message_erreur
+from charts import GraphiquesView
+from fetch_engine import FetchEngine
+from history_store import HistoryStore
+from icon_cache import IconCache, variante_pour
+from refresh_scheduler import RefreshScheduler, conditions_changeantes
+from snapshot import SnapshotStore
+from meteo_core import (
+    API_KEY, VILLE, VILLES, DASHBOARD_CONCURRENCE, METRIQUES_FICHIER, ServiceMeteo, empreinte, traiter_previsions,
+)
+from metrics import Profileur, metrics
+from views import DetailsView, PrevisionsView, TableauVillesView
+
+logger = logging.getLogger("meteo.tableau")
 
-API_KEY = os.getenv("API_KEY")
-VILLE = os.getenv("VILLE")
 
 class AppMeteo:
     def __init__(self, root):
@@ -34,34 +38,96 @@ class AppMeteo:
         # Paramètres API
         self.api_key = API_KEY
         self.ville_actuelle = VILLE
+        self.villes = VILLES
         
         # Variables pour stocker les données
         self.meteo_actuelle = None
         self.previsions = None
         
+        # Version (empreinte) des données affichées et DataFrame mémoïsé
+        self._version_meteo = None
+        self._version_previsions = None
+        self._previsions_df = (None, None)  # (version, DataFrame)
+        
+        # Vues dont les données ont changé mais qui ne sont pas encore redessinées
+        self._vues_sales = set()
+        
+        # Dernier état de chaque ville, enregistré à chaque actualisation
+        # réussie et affiché dès l'ouverture en attendant le réseau
+        self.instantanes = SnapshotStore()
+        self._instantane_du = None  # Date des données hors ligne affichées (None : données en direct)
+        
         # Add refresh interval in milliseconds (5 minutes = 300000ms)
         self.refresh_interval = 300000
-        self._refresh_job = None  # Pour garder la référence du job after
+        
+        # Actualisations planifiées : calées sur les mises à jour amont,
+        # espacées si rien ne change, suspendues fenêtre masquée
+        self.scheduler = RefreshScheduler(self.root, self.refresh_data, self.refresh_interval / 1000)
+        
+        # Les appels réseau tournent en arrière-plan pour ne pas figer l'interface
+        self.fetch_engine = FetchEngine(self.root)
+        
+        # Accès aux données (cache des réponses + client HTTP partagé)
+        self.service = ServiceMeteo(self.api_key)
+        self.response_cache = self.service.response_cache
+        self.api_client = self.service.api_client
+        
+        # Tableau de bord multi-villes : lots de requêtes à concurrence bornée
+        # (planification propre : une recherche ne relance pas toutes les villes)
+        self.tableau_villes = None
+        self.dashboard_engine = None
+        self.scheduler_tableau = None
+        if len(self.villes) > 1:
+            self.dashboard_engine = FetchEngine(self.root, max_workers=DASHBOARD_CONCURRENCE)
+            self.scheduler_tableau = RefreshScheduler(
+                self.root, self.refresh_tableau_villes, self.refresh_interval / 1000, nom="tableau de bord"
+            )
+        
+        # Icônes mises en cache sur disque et en mémoire; celles déjà sur
+        # disque sont décodées et mises à la taille d'affichage en arrière-plan
+        self.icon_cache = IconCache(telecharger=self.api_client.telecharger)
+        threading.Thread(target=self.icon_cache.precharger, name="meteo-icones", daemon=True).start()
+        
+        # Icônes absentes du disque : téléchargées par leur propre pool (jamais
+        # sur le thread Tk ni avant les données), puis les vues qui les
+        # attendaient sont redessinées
+        self.icon_engine = FetchEngine(self.root, max_workers=2)
+        self._icones_a_charger = set()  # (code, taille) à télécharger
+        self._icones_attendues = set()  # (code, taille) affichées sans image
+        
+        # Historique des observations et prévisions (écritures en arrière-plan)
+        self.historique = HistoryStore()
         
         # Mise en place de l'interface
         self.creer_interface()
         
         # Bind tab change event
         self.notebook.bind('<<NotebookTabChanged>>', self._on_tab_change)
+        
+        # Rendu différé tant que la fenêtre est réduite ou masquée
+        self.root.bind('<Map>', self._on_map)
+        self.root.bind('<Unmap>', self._on_map)
 
         # Initialiser le scroll wheel
         self.forecast_canvas.bind_all("<MouseWheel>", self._on_mousewheel)
         
+        # Profilage à chaud : F9 démarre/arrête cProfile, F10 instantané mémoire
+        self.profileur = Profileur()
+        self.root.bind("<F9>", self._basculer_profilage)
+        self.root.bind("<F10>", self._instantane_memoire)
+        
         # Start auto-refresh
         self.start_auto_refresh()
     
     def start_auto_refresh(self):
-        """Start the automatic refresh timer"""
-        self.refresh_data()
-        # Cancel previous job if any
-        if self._refresh_job is not None:
-            self.root.after_cancel(self._refresh_job)
-        self._refresh_job = self.root.after(self.refresh_interval, self.start_auto_refresh)
+        """Démarre la planification (sans doubler la recherche initiale)"""
+        self.scheduler.demarrer()
+        if self.scheduler_tableau is not None:
+            self.scheduler_tableau.demarrer()
+    
+    def _schedulers(self):
+        """Planifications actives (ville affichée, tableau de bord)"""
+        return [s for s in (self.scheduler, self.scheduler_tableau) if s is not None]
     
     def set_refresh_interval(self, event=None):
         """Set refresh interval from dropdown and restart timer"""
@@ -75,33 +141,208 @@ class AppMeteo:
             "1 h": 3600000
         }
         self.refresh_interval = interval_map.get(interval_str, 300000)
-        # Restart auto-refresh with new interval
-        self.start_auto_refresh()
+        # Nouvelle échéance depuis la dernière actualisation (pas de requête en double)
+        for scheduler in self._schedulers():
+            scheduler.set_intervalle(self.refresh_interval / 1000)
     
     def refresh_data(self):
-        """Refresh weather data"""
+        """Refresh weather data (False si aucune ville n'est sélectionnée)"""
         if self.ville_actuelle:
+            ville = self.ville_actuelle
             # Update status bar
-            self.status_bar.config(text=f"Actualisation des données pour {self.ville_actuelle}...")
-            self.root.update()
+            self.status_bar.config(text=f"Actualisation des données pour {ville}...")
             
-            try:
-                # Get new data
-                self.meteo_actuelle = self.obtenir_meteo_actuelle(self.ville_actuelle)
-                self.previsions = self.obtenir_previsions(self.ville_actuelle)
-                
-                # Update display
-                if self.meteo_actuelle and self.previsions:
-                    self.afficher_meteo_actuelle()
-                    self.afficher_previsions()
-                    self.creer_graphiques()
-                    current_time = datetime.now().strftime("%H:%M:%S")
-                    self.status_bar.config(text=f"Données actualisées à {current_time}")
-                else:
-                    self.status_bar.config(text="Erreur lors de l'actualisation des données")
+            # Les deux appels partent en même temps; une nouvelle recherche
+            # annule ce lot et ses réponses tardives sont ignorées
+            self.fetch_engine.submit(
+                {
+                    "meteo": lambda: self._charger_meteo_actuelle(ville),
+                    "previsions": lambda: self._charger_previsions(ville),
+                },
+                lambda resultats, erreurs: self._on_donnees_recues(ville, resultats, erreurs)
+            )
+            return True
+        return False
+    
+    def refresh_tableau_villes(self):
+        """Actualise la ligne de résumé de chaque ville du tableau de bord"""
+        if self.tableau_villes is None:
+            return False
+        debut = time.perf_counter()
+        
+        def on_ville(ville, meteo, erreur):
+            if erreur is not None or not meteo:
+                metrics.compter("erreurs", source="tableau")
+            self.historique.ajouter_observation(ville, meteo)
+            self.tableau_villes.mettre_a_jour(ville, meteo, datetime.now().strftime("%H:%M:%S"))
+        
+        def on_termine(resultats, erreurs):
+            duree = time.perf_counter() - debut
+            logger.info("%d villes actualisées en %.1f s (%d erreurs)", len(resultats), duree, len(erreurs))
+            # Pas de calage sur le dt d'une ville : intervalle, et backoff
+            # seulement si aucune ville n'a répondu
+            self.scheduler_tableau.termine(erreur=bool(erreurs) and not any(resultats.values()))
+        
+        # Une seule requête par ville; la taille du pool borne la concurrence
+        # et le limiteur du client respecte le quota de l'API
+        self.dashboard_engine.submit(
+            {ville: (lambda ville=ville: self.obtenir_meteo_actuelle(ville)) for ville in self.villes},
+            on_termine,
+            on_tache=on_ville,
+        )
+        return True
+    
+    def _afficher_ville(self, ville):
+        """Ouvre le détail et les prévisions d'une ville du tableau de bord"""
+        self.search_entry.delete(0, tk.END)
+        self.search_entry.insert(0, ville)
+        self.notebook.select(self.forecast_frame)
+        self.rechercher_ville()
+    
+    def _charger_meteo_actuelle(self, ville):
+        """Récupère la météo actuelle et prépare son icône si elle est sur disque (thread de travail).
+        
+        Renvoie (données, de_secours) : de_secours si l'API en panne a laissé
+        place aux dernières données connues.
+        """
+        meteo = self.obtenir_meteo_actuelle(ville)
+        secours = self.api_client.de_secours
+        if meteo:
+            self.icon_cache.prefetch([w['icon'] for w in meteo.get('weather', [])[:1]], 100, reseau=False)
+        return meteo, secours
+    
+    def _charger_previsions(self, ville):
+        """Récupère les prévisions et prépare leurs icônes sur disque (thread de travail).
+        
+        Renvoie (données, de_secours), comme ``_charger_meteo_actuelle``.
+        """
+        previsions = self.obtenir_previsions(ville)
+        secours = self.api_client.de_secours
+        if previsions:
+            self.icon_cache.prefetch([p['weather'][0]['icon'] for p in previsions.get('list', [])], 50, reseau=False)
+        return previsions, secours
+    
+    def _charger_icones(self):
+        """Télécharge en arrière-plan les icônes manquantes (un lot à la fois)"""
+        if not self._icones_a_charger or self.icon_engine.en_cours:
+            return
+        cles, self._icones_a_charger = self._icones_a_charger, set()
+        self.icon_engine.submit(
+            {cle: (lambda cle=cle: self.icon_cache.image(*cle)) for cle in cles},
+            self._on_icones_chargees,
+        )
+    
+    def _on_icones_chargees(self, resultats, erreurs):
+        """Icônes prêtes : redessiner les vues qui les attendaient (thread Tk)"""
+        for e in erreurs.values():
+            print(f"Erreur lors du chargement de l'icône: {e}")
+        pretes = self._icones_attendues & resultats.keys()
+        self._icones_attendues -= resultats.keys() | erreurs.keys()
+        if pretes:
+            self._vues_sales.update(("meteo", "previsions"))
+            self._rendre_vues_visibles()
+        self._charger_icones()
+    
+    def _on_donnees_recues(self, ville, resultats, erreurs):
+        """Met à jour l'affichage avec les données reçues (thread Tk)"""
+        if ville != self.ville_actuelle:
+            return
+        if erreurs:
+            e = next(iter(erreurs.values()))
+            texte = f"Erreur lors de l'actualisation: {message_erreur(e)}"
+            if self._instantane_du is not None:
+                texte = f"{self._texte_instantane()} ({texte})"
+            self.status_bar.config(text=texte)
+            self.scheduler.termine(erreur=True)
+            self._exporter_metriques(True)
+            return
+        
+        precedente = self.meteo_actuelle
+        change = perimees = False
+        try:
+            self.meteo_actuelle, secours_meteo = resultats["meteo"]
+            self.previsions, secours_previsions = resultats["previsions"]
+            # Dernières données connues servies faute d'API : affichées mais
+            # périmées (mention hors ligne conservée, pas d'instantané)
+            perimees = secours_meteo or secours_previsions or self.api_client.hors_ligne
             
-            except Exception as e:
-                self.status_bar.config(text=f"Erreur lors de l'actualisation: {str(e)}")
+            # Conserver l'historique (mise en file uniquement, aucune écriture ici)
+            self.historique.ajouter_observation(ville, self.meteo_actuelle)
+            self.historique.ajouter_previsions(ville, self.previsions)
+            
+            # Update display
+            if self.meteo_actuelle and self.previsions:
+                # Une payload inchangée (ex. réponse servie par le cache)
+                # n'est ni retraitée ni redessinée; sinon les vues concernées
+                # sont marquées et seules celles visibles sont redessinées
+                version_meteo = empreinte(self.meteo_actuelle)
+                if version_meteo != self._version_meteo:
+                    self._version_meteo = version_meteo
+                    self._vues_sales.add("meteo")
+                    change = True
+                version_previsions = empreinte(self.previsions)
+                if version_previsions != self._version_previsions:
+                    self._version_previsions = version_previsions
+                    self._vues_sales.update(("previsions", "graphiques"))
+                    change = True
+                if perimees:
+                    if self._instantane_du is None:
+                        # Passage hors ligne : le titre date les données
+                        # affichées (heure de l'observation)
+                        self._instantane_du = self.meteo_actuelle.get('dt') or time.time()
+                        self._vues_sales.add("meteo")
+                else:
+                    if self._instantane_du is not None:
+                        # Données en direct : le titre perd la mention hors ligne
+                        self._instantane_du = None
+                        self._vues_sales.add("meteo")
+                    if change:
+                        self._enregistrer_instantane(ville)
+                self._rendre_vues_visibles()
+                current_time = datetime.now().strftime("%H:%M:%S")
+                stats = self.response_cache.stats()
+                if perimees:
+                    self.status_bar.config(text=f"{self._texte_instantane()} (API indisponible à {current_time})")
+                else:
+                    self.status_bar.config(
+                        text=f"Données actualisées à {current_time} "
+                             f"(cache : {stats['hits']} hits / {stats['misses']} misses)"
+                    )
+            else:
+                self.status_bar.config(text="Erreur lors de l'actualisation des données")
+        
+        except Exception as e:
+            self.status_bar.config(text=f"Erreur lors de l'actualisation: {message_erreur(e)}")
+        
+        # Prochaine actualisation : dernières données servies par le cache
+        # (API hors ligne) ou absentes -> nouvel essai avec backoff
+        erreur = not (self.meteo_actuelle and self.previsions) or perimees
+        self.scheduler.termine(
+            dt=self.meteo_actuelle.get('dt') if self.meteo_actuelle else None,
+            change=change,
+            erreur=erreur,
+            rapide=conditions_changeantes(precedente, self.meteo_actuelle),
+        )
+        self._exporter_metriques(erreur)
+    
+    def _exporter_metriques(self, erreur):
+        """Compteurs d'actualisation et export éventuel (lignes JSON)"""
+        metrics.compter("actualisations")
+        if erreur:
+            metrics.compter("erreurs", source="actualisation")
+        if METRIQUES_FICHIER:
+            metrics.ecrire_jsonl(METRIQUES_FICHIER)
+    
+    def _basculer_profilage(self, event=None):
+        chemin = self.profileur.basculer_cprofile()
+        if chemin is None:
+            self.status_bar.config(text="Profilage cProfile démarré (F9 pour l'arrêter)")
+        else:
+            self.status_bar.config(text=f"Profil cProfile écrit : {chemin}")
+    
+    def _instantane_memoire(self, event=None):
+        chemin = self.profileur.instantane_memoire()
+        self.status_bar.config(text=f"Instantané tracemalloc écrit : {chemin}")
     
     def _on_mousewheel(self, event):
         """Handle mousewheel scrolling"""
@@ -114,6 +355,44 @@ class AppMeteo:
             self.forecast_canvas.bind_all("<MouseWheel>", self._on_mousewheel)
         else:
             self.forecast_canvas.unbind_all("<MouseWheel>")
+        
+        # Les vues ne sont redessinées que lorsque leur onglet est affiché
+        self._rendre_vues_visibles()
+    
+    def _on_map(self, event):
+        """Fenêtre affichée ou réduite"""
+        if event.widget is self.root:
+            # Pas d'actualisation réseau tant que la fenêtre est masquée
+            for scheduler in self._schedulers():
+                if self._fenetre_visible():
+                    scheduler.reprendre()
+                else:
+                    scheduler.pause()
+            self._rendre_vues_visibles()
+    
+    def _fenetre_visible(self):
+        return bool(self.root.winfo_ismapped()) and self.root.state() != "iconic"
+    
+    def _rendre_vues_visibles(self):
+        """Redessine les vues marquées comme modifiées qui sont actuellement visibles"""
+        visible = self._fenetre_visible()
+        onglet = self.notebook.index(self.notebook.select())
+        self.graphiques_view.set_visible(visible and onglet == 1)
+        if not visible:
+            return
+        
+        rendus = [("meteo", self.afficher_meteo_actuelle)]
+        if onglet == 0:
+            rendus.append(("previsions", self.afficher_previsions))
+        elif onglet == 1:
+            rendus.append(("graphiques", self.creer_graphiques))
+        
+        for vue, rendre in rendus:
+            if vue in self._vues_sales:
+                with metrics.chrono("rendu", vue=vue):
+                    rendre()
+                self._vues_sales.discard(vue)
+        self._charger_icones()
     
     def creer_interface(self):
         # --- Use grid on root to separate content and status bar ---
@@ -184,6 +463,7 @@ class AppMeteo:
         # Frame pour les détails météo
         self.details_frame = tk.Frame(self.current_content, bg="white")
         self.details_frame.pack(side=tk.LEFT, padx=20)
+        self.details_view = DetailsView(self.details_frame)
         
         # Notebook pour les prévisions et graphiques
         self.notebook = ttk.Notebook(main_frame)
@@ -211,38 +491,20 @@ class AppMeteo:
         self.forecast_canvas.grid(row=0, column=0, sticky="nsew")
         forecast_scrollbar.grid(row=0, column=1, sticky="ns")
         
-        self.forecast_canvas.configure(yscrollcommand=forecast_scrollbar.set)
-        
-        # Create a frame inside canvas to hold the content
-        self.forecast_inner_frame = tk.Frame(self.forecast_canvas, bg="white")
-        self.forecast_canvas_window = self.forecast_canvas.create_window(
-            (0, 0), 
-            window=self.forecast_inner_frame, 
-            anchor='nw',
-            tags='inner_frame'
-        )
-        
-        # Make the inner frame expand
-        self.forecast_inner_frame.grid_columnconfigure(0, weight=1)
-        
-        # Configure the canvas to resize with the window
-        def configure_canvas(event):
-            # Update the width of canvas
-            canvas_width = event.width
-            self.forecast_canvas.itemconfig(
-                self.forecast_canvas_window,
-                width=canvas_width
-            )
-        
-        def configure_scroll_region(event):
-            self.forecast_canvas.configure(scrollregion=self.forecast_canvas.bbox("all"))
-        
-        self.forecast_canvas.bind('<Configure>', configure_canvas)
-        self.forecast_inner_frame.bind('<Configure>', configure_scroll_region)
+        # Liste virtualisée : seules les lignes visibles ont des widgets,
+        # recyclés au défilement (la vue gère largeur et zone de défilement)
+        self.previsions_view = PrevisionsView(self.forecast_canvas, forecast_scrollbar)
         
         # Onglet pour les graphiques
         self.graph_frame = tk.Frame(self.notebook, bg="white")
         self.notebook.add(self.graph_frame, text="Graphiques")
+        self.graphiques_view = GraphiquesView(self.graph_frame, historique=self.observations_historique)
+        
+        # Onglet tableau de bord (mode multi-villes uniquement)
+        if self.dashboard_engine is not None:
+            villes_frame = tk.Frame(self.notebook, bg="white")
+            self.notebook.add(villes_frame, text=f"Villes ({len(self.villes)})")
+            self.tableau_villes = TableauVillesView(villes_frame, self.villes, self._afficher_ville)
         
         # Statut bar (row 1, always visible at the bottom)
         self.status_bar = tk.Label(
@@ -266,55 +528,83 @@ class AppMeteo:
             messagebox.showerror("Erreur", "Veuillez entrer un nom de ville.")
             return
         
+        # Abandonner les requêtes encore en vol pour l'ancienne ville
+        self.fetch_engine.cancel()
+        nouvelle = ville != self.ville_actuelle or self.meteo_actuelle is None
         self.ville_actuelle = ville
-        self.refresh_data()
+        self.scheduler.executer_maintenant("recherche")
+        
+        # Dernier état connu de la ville affiché sans attendre le réseau
+        if nouvelle:
+            self._restaurer_instantane(ville)
+    
+    def _restaurer_instantane(self, ville):
+        """Affiche l'instantané de ``ville`` (marqué comme ancien) s'il existe"""
+        with metrics.chrono("instantane", operation="chargement"):
+            instantane = self.instantanes.charger(ville)
+        if instantane is None:
+            return
+        self.icon_cache.importer(instantane["icones"])
+        
+        # Le DataFrame est repris tel quel : rien à retraiter, et une réponse
+        # en direct identique ne provoquera aucun nouveau rendu
+        self.meteo_actuelle = instantane["meteo"]
+        self.previsions = None
+        self._version_meteo = empreinte(self.meteo_actuelle)
+        self._version_previsions = instantane["version"]
+        self._previsions_df = (instantane["version"], instantane["df"])
+        self._instantane_du = instantane["enregistre"]
+        self._vues_sales.update(("meteo", "previsions", "graphiques"))
+        self._rendre_vues_visibles()
+        self.status_bar.config(text=f"{self._texte_instantane()} - actualisation en cours...")
+    
+    def _texte_instantane(self):
+        date = datetime.fromtimestamp(self._instantane_du).strftime("%d/%m à %H:%M")
+        return f"Hors ligne : données du {date}"
+    
+    def _enregistrer_instantane(self, ville):
+        """Enregistre l'état affiché de ``ville`` (écriture sur un thread dédié)"""
+        df = self.donnees_previsions()
+        icones = {(code, variante_pour(50)) for code in df['icon'].unique()}
+        icones.add((self.meteo_actuelle['weather'][0]['icon'], variante_pour(100)))
+        
+        def enregistrer(meteo, version):
+            with metrics.chrono("instantane", operation="enregistrement"):
+                disponibles = []
+                for code, variante in sorted(icones):
+                    data = self.icon_cache.sur_disque(code, variante)
+                    if data is not None:
+                        disponibles.append((code, variante, data))
+                self.instantanes.enregistrer(ville, meteo, df, version, disponibles)
+        
+        threading.Thread(
+            target=enregistrer, args=(self.meteo_actuelle, self._version_previsions),
+            name="meteo-instantane", daemon=True,
+        ).start()
     
     def obtenir_meteo_actuelle(self, ville):
         """Récupère les données météo actuelles via l'API"""
-        url = f"https://api.openweathermap.org/data/2.5/weather?q={ville}&appid={self.api_key}&units=metric&lang=fr"
-        response = requests.get(url)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            print(f"Erreur lors de la récupération des données actuelles: {response.status_code}")
-            return None
+        return self.service.obtenir_meteo_actuelle(ville)
     
     def obtenir_previsions(self, ville):
         """Récupère les prévisions sur 5 jours via l'API"""
-        url = f"https://api.openweathermap.org/data/2.5/forecast?q={ville}&appid={self.api_key}&units=metric&lang=fr"
-        response = requests.get(url)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            print(f"Erreur lors de la récupération des prévisions: {response.status_code}")
-            return None
+        return self.service.obtenir_previsions(ville)
     
     def afficher_meteo_actuelle(self):
         """Affiche les données météo actuelles dans l'interface"""
         if not self.meteo_actuelle:
             return
         
-        # Nettoyer les widgets existants
-        for widget in self.details_frame.winfo_children():
-            widget.destroy()
-        
-        # Mettre à jour le titre
-        self.current_title.config(text=f"Météo actuelle à {self.meteo_actuelle['name']}, {self.meteo_actuelle.get('sys', {}).get('country', '')}")
+        # Mettre à jour le titre (données d'un instantané : date affichée)
+        titre = f"Météo actuelle à {self.meteo_actuelle['name']}, {self.meteo_actuelle.get('sys', {}).get('country', '')}"
+        if self._instantane_du is not None:
+            titre += f" ({self._texte_instantane().lower()})"
+        self.current_title.config(text=titre)
         
         # Mettre à jour l'icône météo
-        icon_code = self.meteo_actuelle['weather'][0]['icon']
-        icon_url = f"http://openweathermap.org/img/wn/{icon_code}@2x.png"
-        try:
-            with urllib.request.urlopen(icon_url) as u:
-                raw_data = u.read()
-            img = Image.open(io.BytesIO(raw_data))
-            img = img.resize((100, 100), Image.LANCZOS)
-            photo = ImageTk.PhotoImage(img)
-            self.weather_icon.config(image=photo)
-            self.weather_icon.image = photo  # Garder une référence
-        except Exception as e:
-            print(f"Erreur lors du chargement de l'icône: {e}")
-            self.weather_icon.config(image="")
+        photo = self._icone(self.meteo_actuelle['weather'][0]['icon'], 100)
+        self.weather_icon.config(image=photo if photo is not None else "")
+        self.weather_icon.image = photo  # Garder une référence
         
         # Mettre à jour la température
         self.temp_label.config(text=f"{self.meteo_actuelle['main']['temp']:.1f}°C")
@@ -336,199 +626,104 @@ class AppMeteo:
         if 'snow' in self.meteo_actuelle:
             details.append(("Neige (1h)", f"{self.meteo_actuelle['snow'].get('1h', 0)} mm"))
         
-        # Afficher les détails
-        for i, (label, value) in enumerate(details):
-            tk.Label(self.details_frame, text=f"{label}:", font=("Arial", 10, "bold"), bg="white").grid(row=i, column=0, sticky=tk.W, padx=5, pady=2)
-            tk.Label(self.details_frame, text=value, font=("Arial", 10), bg="white").grid(row=i, column=1, sticky=tk.W, padx=5, pady=2)
+        # Afficher les détails (seuls les libellés modifiés sont reconfigurés)
+        self.details_view.mettre_a_jour(details)
     
     def traiter_previsions(self):
         """Traite les données de prévisions pour l'affichage et les graphiques"""
-        if not self.previsions:
-            return None
-        
-        liste_previsions = self.previsions['list']
-        resultats = []
-        
-        for prevision in liste_previsions:
-            date = datetime.fromtimestamp(prevision['dt'])
-            temp = prevision['main']['temp']
-            ressenti = prevision['main']['feels_like']
-            description = prevision['weather'][0]['description']
-            icon = prevision['weather'][0]['icon']
-            humidite = prevision['main']['humidity']
-            pression = prevision['main']['pressure']
-            vitesse_vent = prevision['wind']['speed']
-            direction_vent = prevision['wind'].get('deg', 0)
-            
-            # Précipitations (si disponibles)
-            pluie = prevision.get('rain', {}).get('3h', 0) if 'rain' in prevision else 0
-            neige = prevision.get('snow', {}).get('3h', 0) if 'snow' in prevision else 0
-            
-            resultats.append({
-                'date': date,
-                'temperature': temp,
-                'ressenti': ressenti,
-                'description': description,
-                'icon': icon,
-                'humidite': humidite,
-                'pression': pression,
-                'vitesse_vent': vitesse_vent,
-                'direction_vent': direction_vent,
-                'pluie': pluie,
-                'neige': neige
-            })
-        
-        df = pd.DataFrame(resultats)
-        df['jour'] = df['date'].dt.date
-        df['heure'] = df['date'].dt.hour
-        
+        return traiter_previsions(self.previsions)
+    
+    def donnees_previsions(self):
+        """DataFrame des prévisions, calculé une seule fois par version des données"""
+        version, df = self._previsions_df
+        if version is None or version != self._version_previsions:
+            df = self.traiter_previsions()
+            self._previsions_df = (self._version_previsions, df)
         return df
     
     def afficher_previsions(self):
         """Affiche les prévisions dans l'onglet des prévisions"""
-        # Nettoyer les widgets existants
-        for widget in self.forecast_inner_frame.winfo_children():
-            widget.destroy()
-        
         # Traitement des prévisions
-        df = self.traiter_previsions()
+        df = self.donnees_previsions()
         if df is None:
             return
         
-        # Obtenir les jours uniques pour l'affichage
-        jours_uniques = df['jour'].unique()
-        
-        # Container principal avec grid
-        main_container = tk.Frame(self.forecast_inner_frame, bg="white")
-        main_container.grid(row=0, column=0, sticky="nsew", padx=20)
-        main_container.grid_columnconfigure(0, weight=1)
-        
-        # Créer une frame pour chaque jour
-        for i, jour in enumerate(jours_uniques):
-            # Frame pour ce jour
-            jour_frame = tk.Frame(main_container, bg="white", bd=1, relief=tk.RIDGE)
-            jour_frame.grid(row=i, column=0, sticky="ew", padx=5, pady=5)
-            jour_frame.grid_columnconfigure(0, weight=1)
-            
-            # Afficher la date
-            date_str = jour.strftime("%A %d %B").capitalize()
-            date_label = tk.Label(jour_frame, text=date_str, font=("Arial", 12, "bold"), bg="white")
-            date_label.pack(fill=tk.X, padx=5, pady=5)
-            
-            # Frame pour contenir les heures avec centrage
-            heures_container = tk.Frame(jour_frame, bg="white")
-            heures_container.pack(fill=tk.X, padx=5, pady=5)
-            
-            heures_frame = tk.Frame(heures_container, bg="white")
-            heures_frame.pack(expand=True, anchor='center')
-            
-            # Filtrer pour ce jour
-            df_jour = df[df['jour'] == jour]
-            
-            # Ajouter les prévisions pour chaque tranche horaire
-            for j, (_, prevision) in enumerate(df_jour.iterrows()):
-                heure_frame = tk.Frame(heures_frame, bg="white", width=100)
-                heure_frame.pack(side=tk.LEFT, padx=10, fill=tk.Y)
-                
-                # Heure
-                heure_label = tk.Label(heure_frame, text=f"{prevision['date'].strftime('%H:%M')}", font=("Arial", 10), bg="white")
-                heure_label.pack()
-                
-                # Icône météo
-                icon_code = prevision['icon']
-                icon_url = f"http://openweathermap.org/img/wn/{icon_code}.png"
-                try:
-                    with urllib.request.urlopen(icon_url) as u:
-                        raw_data = u.read()
-                    img = Image.open(io.BytesIO(raw_data))
-                    img = img.resize((50, 50), Image.LANCZOS)
-                    photo = ImageTk.PhotoImage(img)
-                    icon_label = tk.Label(heure_frame, image=photo, bg="white")
-                    icon_label.image = photo  # Garder une référence
-                    icon_label.pack()
-                except Exception as e:
-                    print(f"Erreur lors du chargement de l'icône: {e}")
-                    
-                # Température
-                temp_label = tk.Label(heure_frame, text=f"{prevision['temperature']:.1f}°C", font=("Arial", 10), bg="white")
-                temp_label.pack()
-                
-                # Description
-                desc_label = tk.Label(heure_frame, text=prevision['description'], font=("Arial", 8), bg="white", wraplength=80)
-                desc_label.pack()
-            
-            # Ajouter un résumé du jour
-            resume_frame = tk.Frame(jour_frame, bg="#f5f5f5")
-            resume_frame.pack(fill=tk.X, padx=5, pady=5)
-            
-            temp_min = df_jour['temperature'].min()
-            temp_max = df_jour['temperature'].max()
-            conditions = df_jour['description'].value_counts().idxmax()
-            
-            resume_label = tk.Label(
-                resume_frame,
-                text=f"Résumé : {conditions.capitalize()} - Min {temp_min:.1f}°C / Max {temp_max:.1f}°C",
-                font=("Arial", 10, "italic"),
-                bg="#f5f5f5"
+        # Résumé de tous les jours sans fonction Python par jour : la
+        # description la plus fréquente vient des effectifs (jour, description)
+        par_jour = df.groupby('jour', sort=False)
+        temperatures = par_jour['temperature'].agg(['min', 'max', 'size'])
+        effectifs = df.groupby(['jour', 'description'], sort=False).size()
+        conditions = effectifs.groupby(level=0, sort=False).idxmax().map(itemgetter(1))
+        
+        # Valeurs des créneaux calculées sur les colonnes entières (une
+        # PhotoImage par code d'icône), puis découpées par jour (lignes
+        # consécutives); seules les lignes visibles de la liste virtualisée
+        # sont ensuite appliquées à des widgets
+        photos = {icon: self._icone(icon, 50) for icon in df['icon'].unique()}
+        creneaux = list(zip(
+            df['date'].dt.strftime('%H:%M').tolist(),
+            map(photos.get, df['icon'].tolist()),
+            df['temperature'].tolist(),
+            df['description'].tolist(),
+        ))
+        
+        jours = []
+        debut = 0
+        for jour, temp_min, temp_max, taille in zip(
+            temperatures.index, temperatures['min'], temperatures['max'], temperatures['size'].tolist()
+        ):
+            texte_resume = (
+                f"Résumé : {conditions[jour].capitalize()} - "
+                f"Min {temp_min:.1f}°C / Max {temp_max:.1f}°C"
             )
-            resume_label.pack()
+            jours.append((jour, jour.strftime("%A %d %B").capitalize(), creneaux[debut:debut + taille], texte_resume))
+            debut += taille
+        
+        self.previsions_view.mettre_a_jour(jours)
+    
+    def _icone(self, code, taille):
+        """PhotoImage partagée d'une icône, None si elle n'est pas encore prête.
+
+        Sans réseau : une icône absente de l'atlas et du disque est mise en
+        file de téléchargement et la vue sera redessinée à son arrivée.
+        """
+        try:
+            photo = self.icon_cache.photo(code, taille)
+        except Exception as e:
+            print(f"Erreur lors du chargement de l'icône: {e}")
+            return None
+        if photo is None:
+            self._icones_attendues.add((code, taille))
+            self._icones_a_charger.add((code, taille))
+        return photo
+    
+    def observations_historique(self, debut):
+        """Observations enregistrées pour la ville affichée depuis ``debut``"""
+        return self.historique.observations(self.ville_actuelle, debut)
     
     def creer_graphiques(self):
-        """Crée les graphiques météo dans l'onglet Graphiques"""
-        # Nettoyer les anciens graphiques
-        for widget in self.graph_frame.winfo_children():
-            widget.destroy()
-        
-        df = self.traiter_previsions()
+        """Met à jour les graphiques météo dans l'onglet Graphiques"""
+        df = self.donnees_previsions()
         if df is None:
             return
         
-        # Préparer la figure matplotlib
-        fig, axs = plt.subplots(2, 2, figsize=(12, 8))
-        fig.tight_layout(pad=4)
-        
-        # Graphique Température
-        axs[0, 0].plot(df['date'], df['temperature'], label='Température (°C)', color='tab:red')
-        axs[0, 0].plot(df['date'], df['ressenti'], label='Ressenti (°C)', color='tab:orange', linestyle='--')
-        axs[0, 0].set_title("Évolution de la température")
-        axs[0, 0].set_xlabel("Date/Heure")
-        axs[0, 0].set_ylabel("Température (°C)")
-        axs[0, 0].legend()
-        axs[0, 0].grid(True)
-        
-        # Graphique Humidité
-        axs[0, 1].plot(df['date'], df['humidite'], label='Humidité (%)', color='tab:blue')
-        axs[0, 1].set_title("Évolution de l'humidité")
-        axs[0, 1].set_xlabel("Date/Heure")
-        axs[0, 1].set_ylabel("Humidité (%)")
-        axs[0, 1].grid(True)
-        
-        # Graphique Vent
-        axs[1, 0].plot(df['date'], df['vitesse_vent'], label='Vitesse du vent (m/s)', color='tab:green')
-        axs[1, 0].set_title("Vitesse du vent")
-        axs[1, 0].set_xlabel("Date/Heure")
-        axs[1, 0].set_ylabel("Vitesse (m/s)")
-        axs[1, 0].grid(True)
-        
-        # Graphique Pluie/Neige
-        axs[1, 1].bar(df['date'], df['pluie'], label='Pluie (mm)', color='tab:cyan')
-        axs[1, 1].bar(df['date'], df['neige'], label='Neige (mm)', color='tab:gray', bottom=df['pluie'])
-        axs[1, 1].set_title("Précipitations")
-        axs[1, 1].set_xlabel("Date/Heure")
-        axs[1, 1].set_ylabel("Quantité (mm)")
-        axs[1, 1].legend()
-        axs[1, 1].grid(True)
-        
-        # Embedding de la figure matplotlib dans Tkinter
-        canvas = FigureCanvasTkAgg(fig, master=self.graph_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        # Figure persistante : rendu différé tant que l'onglet n'est pas visible
+        self.graphiques_view.mettre_a_jour(df)
 
 # Lancement de l'application
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s : %(message)s")
     root = tk.Tk()
     app = AppMeteo(root)
     def on_closing():
+        for scheduler in app._schedulers():
+            scheduler.arreter()
+        app.fetch_engine.shutdown()
+        app.icon_engine.shutdown()
+        if app.dashboard_engine is not None:
+            app.dashboard_engine.shutdown()
+        app.service.fermer()
+        app.historique.fermer()
         root.destroy()
         sys.exit()
     root.protocol('WM_DELETE_WINDOW', on_closing)
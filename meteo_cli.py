@@ -0,0 +1,112 @@
+"""Mode ligne de commande (sans interface graphique).
+
+Récupère la météo actuelle ou les prévisions d'une ou plusieurs villes et
+les écrit en JSON ou en CSV sur la sortie standard, pour les tâches cron et
+les serveurs. N'importe ni tkinter, ni matplotlib, ni PIL.
+
+    python meteo_cli.py Paris,FR Lyon,FR
+    python meteo_cli.py --previsions --format csv Paris,FR > previsions.csv
+    python meteo_cli.py --temps            # affiche le temps de démarrage sur stderr
+    python meteo_cli.py --metriques prometheus Paris,FR   # mesures sur stderr
+"""
+import time
+
+_DEBUT = time.perf_counter()
+
+import argparse  # noqa: E402
+import csv  # noqa: E402
+import json  # noqa: E402
+import sys  # noqa: E402
+from concurrent.futures import ThreadPoolExecutor  # noqa: E402
+
+from meteo_core import DASHBOARD_CONCURRENCE, METRIQUES_FICHIER, VILLES, ServiceMeteo, traiter_previsions  # noqa: E402
+from metrics import metrics  # noqa: E402
+
+# Colonnes du résumé CSV de la météo actuelle
+COLONNES_ACTUELLE = ("ville", "date", "temperature", "ressenti", "humidite", "pression", "vitesse_vent", "description")
+
+
+def resume_actuelle(ville, meteo):
+    """Ligne de résumé (dict) d'une réponse /weather"""
+    return {
+        "ville": ville,
+        "date": meteo.get("dt"),
+        "temperature": meteo["main"]["temp"],
+        "ressenti": meteo["main"]["feels_like"],
+        "humidite": meteo["main"]["humidity"],
+        "pression": meteo["main"]["pressure"],
+        "vitesse_vent": meteo["wind"]["speed"],
+        "description": meteo["weather"][0]["description"],
+    }
+
+
+def ecrire_actuelle(resultats, format, sortie):
+    if format == "json":
+        json.dump(resultats, sortie, ensure_ascii=False, indent=2)
+        sortie.write("\n")
+        return
+    writer = csv.DictWriter(sortie, fieldnames=COLONNES_ACTUELLE)
+    writer.writeheader()
+    for ville, meteo in resultats.items():
+        if meteo:
+            writer.writerow(resume_actuelle(ville, meteo))
+
+
+def ecrire_previsions(resultats, format, sortie):
+    import pandas as pd
+
+    frames = []
+    for ville, previsions in resultats.items():
+        df = traiter_previsions(previsions)
+        if df is not None:
+            frames.append(df.drop(columns=["jour"]).assign(ville=ville))
+    if not frames:
+        return
+    df = pd.concat(frames, ignore_index=True)
+    df = df[["ville"] + [c for c in df.columns if c != "ville"]]
+    if format == "json":
+        sortie.write(df.to_json(orient="records", date_format="iso", force_ascii=False, indent=2))
+        sortie.write("\n")
+    else:
+        df.to_csv(sortie, index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Météo OpenWeatherMap en ligne de commande")
+    parser.add_argument("villes", nargs="*", help="villes (par défaut : VILLE / VILLES_FICHIER)")
+    parser.add_argument("--previsions", action="store_true", help="prévisions 5 jours traitées au lieu de la météo actuelle")
+    parser.add_argument("--format", choices=("json", "csv"), default="json")
+    parser.add_argument("--temps", action="store_true", help="afficher les temps de démarrage et d'exécution sur stderr")
+    parser.add_argument("--metriques", choices=("json", "prometheus"), help="écrire les mesures (durées, compteurs) sur stderr")
+    args = parser.parse_args(argv)
+
+    demarrage = time.perf_counter() - _DEBUT
+    villes = args.villes or VILLES
+    if not villes:
+        parser.error("aucune ville : passer des villes en argument ou définir VILLE")
+
+    service = ServiceMeteo()
+    obtenir = service.obtenir_previsions if args.previsions else service.obtenir_meteo_actuelle
+    try:
+        with ThreadPoolExecutor(max_workers=min(len(villes), DASHBOARD_CONCURRENCE)) as pool:
+            resultats = dict(zip(villes, pool.map(obtenir, villes)))
+    finally:
+        service.fermer()
+
+    if args.previsions:
+        ecrire_previsions(resultats, args.format, sys.stdout)
+    else:
+        ecrire_actuelle(resultats, args.format, sys.stdout)
+
+    if args.temps:
+        total = time.perf_counter() - _DEBUT
+        print(f"démarrage : {demarrage * 1000:.1f} ms, total : {total * 1000:.1f} ms", file=sys.stderr)
+    if args.metriques:
+        sys.stderr.write(metrics.prometheus() if args.metriques == "prometheus" else metrics.ligne_json() + "\n")
+    if METRIQUES_FICHIER:
+        metrics.ecrire_jsonl(METRIQUES_FICHIER)
+    return 0 if all(resultats.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+"""Cœur de l'application météo, sans interface graphique.
+
+Configuration, récupération des données (``obtenir_*``) et traitement des
+prévisions (``traiter_previsions``). Ce module n'importe ni tkinter, ni
+matplotlib, ni PIL; pandas/NumPy ne sont chargés qu'au premier traitement
+des prévisions et requests qu'à la première requête réseau. Il sert à la
+fois à l'interface (main.py) et au mode ligne de commande (meteo_cli.py).
+"""
+import hashlib
+import json
+import os
+import sys
+import time
+from operator import itemgetter
+
+import dotenv
+
+import onecall
+from api_client import OpenWeatherClient, RateLimiter, API_URL, ONECALL_URL
+from geocoding import GEO_URL, Geocodeur
+from keyed_lock import KeyedLock
+from metrics import metrics
+from response_cache import ResponseCache
+
+# API settings
+dotenv.load_dotenv()
+
+API_KEY = os.getenv("API_KEY")
+
+
+def charger_villes():
+    """Liste des villes suivies.
+
+    ``VILLES_FICHIER`` désigne un fichier texte (une ville par ligne, ``#`` pour
+    les commentaires); sinon ``VILLE`` peut en lister plusieurs, séparées par
+    des ``;`` (la virgule reste réservée au code pays, ex. ``Paris,FR``).
+    """
+    fichier = os.getenv("VILLES_FICHIER")
+    if fichier:
+        with open(fichier, encoding="utf-8") as f:
+            lignes = [ligne.split("#", 1)[0] for ligne in f]
+    else:
+        lignes = (os.getenv("VILLE") or "").split(";")
+    villes = []
+    for ligne in lignes:
+        ville = ligne.strip()
+        if ville and ville not in villes:
+            villes.append(ville)
+    return villes
+
+
+VILLES = charger_villes()
+VILLE = VILLES[0] if VILLES else ""
+
+# Mode multi-villes : requêtes simultanées et débit maximal vers l'API
+DASHBOARD_CONCURRENCE = int(os.getenv("DASHBOARD_CONCURRENCE", "8"))
+API_LIMITE_PAR_MINUTE = int(os.getenv("API_LIMITE_PAR_MINUTE", "60"))
+
+# Client HTTP : URL de base (serveur bouchon possible) et timeouts (secondes)
+API_BASE_URL = os.getenv("API_BASE_URL", API_URL)
+API_TIMEOUT_CONNEXION = float(os.getenv("API_TIMEOUT_CONNEXION", "3.05"))
+API_TIMEOUT_LECTURE = float(os.getenv("API_TIMEOUT_LECTURE", "10"))
+
+# Géocodage et One Call : mêmes URL que l'API par défaut, sinon celle du
+# serveur bouchon. One Call 3.0 demande un abonnement : désactivé par défaut.
+API_GEO_URL = os.getenv("API_GEO_URL", GEO_URL if API_BASE_URL == API_URL else API_BASE_URL)
+API_ONECALL_URL = os.getenv("API_ONECALL_URL", ONECALL_URL if API_BASE_URL == API_URL else API_BASE_URL)
+API_ONECALL = os.getenv("API_ONECALL", "0") == "1"
+
+# Fichier de métriques (lignes JSON), ajouté à chaque actualisation si défini
+METRIQUES_FICHIER = os.getenv("METEO_METRIQUES_FICHIER")
+
+# Durées de vie du cache des réponses (secondes)
+CACHE_TTLS = {
+    "weather": int(os.getenv("CACHE_TTL_METEO", "120")),
+    "forecast": int(os.getenv("CACHE_TTL_PREVISIONS", "10800")),
+    "onecall": int(os.getenv("CACHE_TTL_METEO", "120")),
+}
+
+
+def empreinte(payload):
+    """Empreinte stable d'une réponse JSON (identifie une version des données)"""
+    if payload is None:
+        return None
+    contenu = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.sha1(contenu).hexdigest()
+
+
+def timestamps_locaux(dt):
+    """Convertit des timestamps Unix en dates locales naïves, de façon vectorisée.
+
+    Le décalage horaire (heure d'été comprise) n'est calculé qu'une fois par
+    heure distincte, puis appliqué à toute la colonne.
+    """
+    import numpy as np
+    import pandas as pd
+
+    heures, inverse = np.unique(dt // 3600, return_inverse=True)
+    decalages = np.fromiter((time.localtime(h * 3600).tm_gmtoff for h in heures.tolist()), dtype=np.int64, count=len(heures))
+    return pd.to_datetime(dt + decalages[inverse], unit='s')
+
+
+def traiter_previsions(previsions):
+    """Traite les données de prévisions pour l'affichage et les graphiques"""
+    if not previsions:
+        return None
+
+    debut = time.perf_counter()
+    import numpy as np
+    import pandas as pd
+
+    liste_previsions = previsions['list']
+    n = len(liste_previsions)
+
+    def colonne(valeurs, dtype):
+        return np.fromiter(valeurs, dtype=dtype, count=n)
+
+    # Colonnes typées construites directement depuis le JSON
+    mains = [prevision['main'] for prevision in liste_previsions]
+    meteos = [prevision['weather'][0] for prevision in liste_previsions]
+    vents = [prevision['wind'] for prevision in liste_previsions]
+    dt = colonne(map(itemgetter('dt'), liste_previsions), np.int64)
+
+    df = pd.DataFrame({
+        'date': timestamps_locaux(dt),
+        'temperature': colonne(map(itemgetter('temp'), mains), np.float64),
+        'ressenti': colonne(map(itemgetter('feels_like'), mains), np.float64),
+        'description': list(map(itemgetter('description'), meteos)),
+        'icon': list(map(itemgetter('icon'), meteos)),
+        'humidite': colonne(map(itemgetter('humidity'), mains), np.int64),
+        'pression': colonne(map(itemgetter('pressure'), mains), np.int64),
+        'vitesse_vent': colonne(map(itemgetter('speed'), vents), np.float64),
+        'direction_vent': colonne((vent.get('deg', 0) for vent in vents), np.int64),
+        # Précipitations (si disponibles)
+        'pluie': colonne((prevision.get('rain', {}).get('3h', 0) for prevision in liste_previsions), np.float64),
+        'neige': colonne((prevision.get('snow', {}).get('3h', 0) for prevision in liste_previsions), np.float64),
+    })
+    df['jour'] = df['date'].dt.date
+    df['heure'] = df['date'].dt.hour
+
+    metrics.enregistrer("traitement_previsions", time.perf_counter() - debut)
+    return df
+
+
+class ServiceMeteo:
+    """Accès aux données OpenWeatherMap (cache des réponses + client HTTP).
+
+    Les villes sont géocodées une fois, puis interrogées par coordonnées.
+    Avec ``avec_onecall``, la météo actuelle et les prévisions viennent d'un même
+    appel One Call (un seul appel amont par actualisation); si l'API le
+    refuse (pas d'abonnement), le service revient aux deux endpoints.
+    """
+
+    def __init__(self, api_key=API_KEY, base_url=API_BASE_URL, taille_pool=None, avec_onecall=API_ONECALL):
+        # Réponses de l'API mises en cache (TTL par endpoint, persistant)
+        self.response_cache = ResponseCache(CACHE_TTLS)
+
+        # Client HTTP partagé (pool de connexions, timeouts, disjoncteur)
+        self.api_client = OpenWeatherClient(
+            api_key,
+            cache=self.response_cache,
+            base_url=base_url,
+            timeout_connexion=API_TIMEOUT_CONNEXION,
+            timeout_lecture=API_TIMEOUT_LECTURE,
+            taille_pool=taille_pool or max(10, DASHBOARD_CONCURRENCE),
+            limiteur=RateLimiter(API_LIMITE_PAR_MINUTE),
+        )
+
+        # Nom de ville -> coordonnées (cache persistant)
+        self.geocodeur = Geocodeur(self.api_client, base_url=API_GEO_URL)
+
+        # Compteurs du cache exportés avec les autres métriques
+        metrics.jauge("cache_reponses", self.response_cache.stats)
+        self.avec_onecall = avec_onecall
+        self._verrous = KeyedLock()  # Un seul appel One Call à la fois par lieu
+
+    def _parametres(self, ville, lieu):
+        """Paramètres de requête : coordonnées si la ville est géocodée, sinon son nom"""
+        if lieu is None:
+            return {"q": ville, "units": "metric", "lang": "fr"}
+        return {"lat": lieu["lat"], "lon": lieu["lon"], "units": "metric", "lang": "fr"}
+
+    def _obtenir(self, endpoint, ville):
+        """Code HTTP et données de forme /weather ou /forecast pour une ville"""
+        lieu = self.geocodeur.resoudre(ville)
+        if self.avec_onecall and lieu is not None:
+            data = self._onecall(lieu)
+            if data is not None:
+                adapter = onecall.meteo_actuelle if endpoint == "weather" else onecall.previsions
+                return 200, adapter(data, lieu)
+        return self.api_client.requete(endpoint, self._parametres(ville, lieu))
+
+    def _onecall(self, lieu):
+        """Réponse One Call d'un lieu; None si l'endpoint n'est pas disponible"""
+        # Météo actuelle et prévisions sont demandées en parallèle : le second
+        # appel attend le premier puis est servi par le cache des réponses
+        with self._verrous.verrou((lieu["lat"], lieu["lon"])):
+            status_code, data = self.api_client.requete(
+                "onecall",
+                {"lat": lieu["lat"], "lon": lieu["lon"], "units": "metric", "lang": "fr", "exclude": "minutely,alerts"},
+                base_url=API_ONECALL_URL,
+            )
+        if status_code in (401, 403, 404):
+            print(f"One Call indisponible ({status_code}), retour aux endpoints /weather et /forecast", file=sys.stderr)
+            self.avec_onecall = False
+        return data if status_code == 200 else None
+
+    def obtenir_meteo_actuelle(self, ville):
+        """Récupère les données météo actuelles via l'API"""
+        status_code, data = self._obtenir("weather", ville)
+        if status_code == 200:
+            return data
+        else:
+            print(f"Erreur lors de la récupération des données actuelles: {status_code}", file=sys.stderr)
+            return None
+
+    def obtenir_previsions(self, ville):
+        """Récupère les prévisions sur 5 jours via l'API"""
+        status_code, data = self._obtenir("forecast", ville)
+        if status_code == 200:
+            return data
+        else:
+            print(f"Erreur lors de la récupération des prévisions: {status_code}", file=sys.stderr)
+            return None
+
+    def fermer(self):
+        self.api_client.fermer()
@@ -0,0 +1,258 @@
+"""Mode serveur HTTP/JSON (asyncio, sans dépendance supplémentaire).
+
+Expose la météo actuelle, les prévisions brutes et les prévisions traitées
+(``traiter_previsions``) par ville, pour que plusieurs postes partagent un
+seul cache et un seul quota OpenWeatherMap :
+
+    GET /meteo?ville=Paris,FR
+    GET /previsions?ville=Paris,FR
+    GET /previsions/traitees?ville=Paris,FR
+    GET /stats
+    GET /metrics          (format texte Prometheus)
+
+Les requêtes simultanées pour la même ville et la même donnée sont
+regroupées en un seul appel amont (« single-flight »).
+
+    python meteo_server.py --hote 127.0.0.1 --port 8080
+
+Sous Unix, SIGUSR1 démarre/arrête cProfile et SIGUSR2 écrit un instantané
+tracemalloc (chemins affichés sur stderr).
+"""
+import argparse
+import asyncio
+import json
+import signal
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from api_client import masquer_cle
+from meteo_core import DASHBOARD_CONCURRENCE, ServiceMeteo, traiter_previsions
+from metrics import Profileur, metrics
+
+TYPE_PROMETHEUS = "text/plain; version=0.0.4; charset=utf-8"
+
+# Routes servies; toute autre est comptée sous l'étiquette « autre » (le
+# chemin brut d'un client ne devient jamais une série de métriques)
+ROUTES = ("/meteo", "/previsions", "/previsions/traitees", "/stats", "/metrics")
+
+# Corps JSON encodés gardés en mémoire (les moins récemment servis sont évincés)
+MAX_ENCODES = 512
+
+
+class ErreurHTTP(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class MeteoServer:
+    """Serveur HTTP partageant un ServiceMeteo entre tous les clients"""
+
+    def __init__(self, service=None, workers=DASHBOARD_CONCURRENCE):
+        self.service = service or ServiceMeteo()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="meteo-server")
+        self._en_vol = {}   # (donnée, ville) -> Future de l'appel en cours
+        self._encodes = OrderedDict()  # (donnée, ville) -> (payload source, corps JSON encodé)
+        self._serveur = None
+        self.stats = {"requetes": 0, "appels": 0, "coalescees": 0, "erreurs": 0}
+        metrics.jauge("serveur", lambda: dict(self.stats))
+
+    async def demarrer(self, hote="127.0.0.1", port=8080):
+        self._serveur = await asyncio.start_server(self._client, hote, port)
+        return self._serveur
+
+    @property
+    def port(self):
+        return self._serveur.sockets[0].getsockname()[1]
+
+    async def fermer(self):
+        if self._serveur is not None:
+            self._serveur.close()
+            await self._serveur.wait_closed()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.service.fermer()
+
+    async def _single_flight(self, cle, fn, *args):
+        """Exécute ``fn(*args)`` dans le pool; les appels simultanés de même clé partagent le résultat"""
+        future = self._en_vol.get(cle)
+        if future is None:
+            self.stats["appels"] += 1
+            future = asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+            self._en_vol[cle] = future
+            future.add_done_callback(lambda _: self._en_vol.pop(cle, None))
+        else:
+            self.stats["coalescees"] += 1
+        # shield : un client qui se déconnecte n'annule pas l'appel des autres
+        return await asyncio.shield(future)
+
+    def _encode(self, cle):
+        """(payload source, corps) déjà encodés pour ``cle``, ou (None, None)"""
+        if cle not in self._encodes:
+            return None, None
+        self._encodes.move_to_end(cle)
+        return self._encodes[cle]
+
+    def _memoriser(self, cle, payload, corps):
+        self._encodes[cle] = (payload, corps)
+        self._encodes.move_to_end(cle)
+        while len(self._encodes) > MAX_ENCODES:
+            self._encodes.popitem(last=False)
+
+    def _encoder(self, cle, payload):
+        """Corps JSON de la réponse, réencodé seulement si la payload a changé"""
+        source, corps = self._encode(cle)
+        if source is not payload:
+            corps = json.dumps(payload, ensure_ascii=False).encode()
+            self._memoriser(cle, payload, corps)
+        return corps
+
+    async def donnees(self, chemin, ville):
+        """Corps JSON pour une route et une ville"""
+        if chemin == "/meteo":
+            meteo = await self._single_flight(("meteo", ville), self.service.obtenir_meteo_actuelle, ville)
+            if not meteo:
+                raise ErreurHTTP(HTTPStatus.BAD_GATEWAY, "météo actuelle indisponible")
+            return self._encoder(("meteo", ville), meteo)
+
+        previsions = await self._single_flight(("previsions", ville), self.service.obtenir_previsions, ville)
+        if not previsions:
+            raise ErreurHTTP(HTTPStatus.BAD_GATEWAY, "prévisions indisponibles")
+        if chemin == "/previsions":
+            return self._encoder(("previsions", ville), previsions)
+
+        # Prévisions traitées : recalculées une fois par nouvelle payload
+        cle = ("traitees", ville)
+        source, corps = self._encode(cle)
+        if source is not previsions:
+            corps = await self._single_flight(cle, _traiter_en_json, previsions)
+            self._memoriser(cle, previsions, corps)
+        return corps
+
+    async def _repondre(self, chemin, requete):
+        if chemin == "/metrics":
+            return HTTPStatus.OK, metrics.prometheus().encode()
+        if chemin == "/stats":
+            stats = dict(self.stats, cache=self.service.response_cache.stats())
+            return HTTPStatus.OK, json.dumps(stats).encode()
+        if chemin not in ROUTES:
+            raise ErreurHTTP(HTTPStatus.NOT_FOUND, "route inconnue")
+        ville = (parse_qs(requete).get("ville") or [""])[0].strip()
+        if not ville:
+            raise ErreurHTTP(HTTPStatus.BAD_REQUEST, "paramètre ville manquant")
+        return HTTPStatus.OK, await self.donnees(chemin, ville)
+
+    async def _client(self, reader, writer):
+        """Boucle HTTP/1.1 keep-alive d'une connexion"""
+        try:
+            while True:
+                ligne = await reader.readline()
+                if not ligne:
+                    break
+                try:
+                    methode, cible, version = ligne.decode("latin-1").split()
+                except ValueError:
+                    break
+                entetes = {}
+                while True:
+                    ligne = await reader.readline()
+                    if ligne in (b"\r\n", b"\n", b""):
+                        break
+                    nom, _, valeur = ligne.decode("latin-1").partition(":")
+                    entetes[nom.strip().lower()] = valeur.strip()
+
+                self.stats["requetes"] += 1
+                url = urlsplit(cible)
+                debut = time.perf_counter()
+                try:
+                    if methode != "GET":
+                        raise ErreurHTTP(HTTPStatus.METHOD_NOT_ALLOWED, "GET uniquement")
+                    status, corps = await self._repondre(url.path, url.query)
+                except ErreurHTTP as e:
+                    status, corps = e.status, json.dumps({"erreur": str(e)}, ensure_ascii=False).encode()
+                except Exception as e:
+                    self.stats["erreurs"] += 1
+                    status, message = _erreur_interne(e, url.path)
+                    corps = json.dumps({"erreur": message}, ensure_ascii=False).encode()
+                metrics.enregistrer("requete_serveur", time.perf_counter() - debut, route=url.path if url.path in ROUTES else "autre", status=status.value)
+
+                type_contenu = TYPE_PROMETHEUS if url.path == "/metrics" else "application/json; charset=utf-8"
+                garder = version == "HTTP/1.1" and entetes.get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                    f"Content-Type: {type_contenu}\r\n"
+                    f"Content-Length: {len(corps)}\r\n"
+                    f"Connection: {'keep-alive' if garder else 'close'}\r\n\r\n".encode("latin-1") + corps
+                )
+                await writer.drain()
+                if not garder:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+def _erreur_interne(e, chemin):
+    """Statut et message fixe d'une erreur imprévue.
+
+    Le texte d'une exception peut contenir l'URL amont et la clé API : il
+    n'est jamais renvoyé au client, seulement journalisé (clé masquée).
+    """
+    import requests
+
+    print(f"Erreur sur {chemin} : {masquer_cle(f'{type(e).__name__}: {e}')}", file=sys.stderr)
+    if isinstance(e, requests.RequestException):
+        return HTTPStatus.BAD_GATEWAY, "service météo amont indisponible"
+    return HTTPStatus.INTERNAL_SERVER_ERROR, "erreur interne"
+
+
+def _traiter_en_json(previsions):
+    df = traiter_previsions(previsions)
+    return df.drop(columns=["jour"]).to_json(orient="records", date_format="iso", force_ascii=False).encode()
+
+
+def _installer_profilage(boucle):
+    """Profilage à chaud par signaux (Unix uniquement)"""
+    if not hasattr(signal, "SIGUSR1"):
+        return
+    profileur = Profileur()
+
+    def basculer():
+        chemin = profileur.basculer_cprofile()
+        print(f"cProfile {'démarré' if chemin is None else 'écrit : ' + chemin}", file=sys.stderr)
+
+    def memoire():
+        print(f"Instantané tracemalloc écrit : {profileur.instantane_memoire()}", file=sys.stderr)
+
+    boucle.add_signal_handler(signal.SIGUSR1, basculer)
+    boucle.add_signal_handler(signal.SIGUSR2, memoire)
+
+
+async def servir(hote, port):
+    serveur = MeteoServer()
+    await serveur.demarrer(hote, port)
+    _installer_profilage(asyncio.get_running_loop())
+    print(f"Serveur météo sur http://{hote}:{serveur.port}", file=sys.stderr)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await serveur.fermer()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serveur HTTP/JSON de données météo")
+    parser.add_argument("--hote", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(servir(args.hote, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""Instrumentation : durées par étape, compteurs et jauges.
+
+Un registre global (``metrics``) partagé par tous les modules :
+
+    with metrics.chrono("api", endpoint="weather"):
+        ...
+    metrics.compter("erreurs", source="api")
+    metrics.jauge("rss_octets", rss)
+
+Pour chaque étape chronométrée on garde le nombre d'appels, le cumul, le
+maximum et la dernière durée; les jauges sont des fonctions évaluées à
+l'export. Deux formats d'export : texte Prometheus (``prometheus()``) et
+lignes JSON (``ligne_json()``, ``ecrire_jsonl()``).
+
+Profilage à la demande : ``Profileur.basculer_cprofile()`` démarre ou
+arrête cProfile (résultat en .prof), ``Profileur.instantane_memoire()``
+écrit les plus grosses allocations vues par tracemalloc.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from app_paths import cache_dir
+
+PREFIXE = "meteo"
+
+
+def rss():
+    """Mémoire résidente du processus en octets (None si inconnue)"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        # Pic de mémoire résidente : Ko sous Linux, octets sous macOS
+        pic = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return pic if sys.platform == "darwin" else pic * 1024
+    except ImportError:
+        return None
+
+
+def _etiquettes(etiquettes):
+    return tuple(sorted(etiquettes.items()))
+
+
+def _echapper(valeur):
+    """Valeur d'étiquette au format d'exposition Prometheus (\\, " et retours à la ligne)"""
+    return str(valeur).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_etiquettes(etiquettes, supplement=()):
+    paires = list(etiquettes) + list(supplement)
+    if not paires:
+        return ""
+    return "{" + ",".join(f'{cle}="{_echapper(valeur)}"' for cle, valeur in paires) + "}"
+
+
+class Metrics:
+    """Registre de mesures, utilisable depuis n'importe quel thread"""
+
+    def __init__(self):
+        self.debut = time.time()
+        self._durees = {}    # (nom, étiquettes) -> [nombre, cumul, max, dernière]
+        self._compteurs = {}  # (nom, étiquettes) -> valeur
+        self._jauges = {}     # nom -> fonction sans argument
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def chrono(self, etape, **etiquettes):
+        """Chronomètre le bloc et l'enregistre sous ``etape``"""
+        debut = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.enregistrer(etape, time.perf_counter() - debut, **etiquettes)
+
+    def enregistrer(self, etape, duree, **etiquettes):
+        cle = (etape, _etiquettes(etiquettes))
+        with self._lock:
+            mesure = self._durees.get(cle)
+            if mesure is None:
+                self._durees[cle] = [1, duree, duree, duree]
+            else:
+                mesure[0] += 1
+                mesure[1] += duree
+                mesure[2] = max(mesure[2], duree)
+                mesure[3] = duree
+
+    def compter(self, nom, valeur=1, **etiquettes):
+        cle = (nom, _etiquettes(etiquettes))
+        with self._lock:
+            self._compteurs[cle] = self._compteurs.get(cle, 0) + valeur
+
+    def jauge(self, nom, fonction):
+        """Enregistre une jauge; ``fonction()`` renvoie un nombre ou un dict {étiquette: nombre}"""
+        with self._lock:
+            self._jauges[nom] = fonction
+
+    def _valeurs_jauges(self):
+        with self._lock:
+            jauges = list(self._jauges.items())
+        valeurs = {}
+        for nom, fonction in jauges:
+            try:
+                valeurs[nom] = fonction()
+            except Exception as e:
+                print(f"Erreur lors de la lecture de la jauge {nom}: {e}", file=sys.stderr)
+        return valeurs
+
+    def instantane(self):
+        """Toutes les mesures dans un dict sérialisable en JSON"""
+        with self._lock:
+            durees = {cle: list(mesure) for cle, mesure in self._durees.items()}
+            compteurs = dict(self._compteurs)
+        return {
+            "temps": time.time(),
+            "uptime_s": time.time() - self.debut,
+            "etapes": [
+                {"etape": etape, **dict(etiquettes), "nombre": nombre, "total_s": cumul,
+                 "moyenne_ms": cumul / nombre * 1000, "max_ms": maximum * 1000, "derniere_ms": derniere * 1000}
+                for (etape, etiquettes), (nombre, cumul, maximum, derniere) in sorted(durees.items())
+            ],
+            "compteurs": [
+                {"nom": nom, **dict(etiquettes), "valeur": valeur}
+                for (nom, etiquettes), valeur in sorted(compteurs.items())
+            ],
+            "jauges": self._valeurs_jauges(),
+        }
+
+    def ligne_json(self):
+        return json.dumps(self.instantane(), ensure_ascii=False)
+
+    def ecrire_jsonl(self, chemin):
+        """Ajoute un instantané en fin de fichier (une ligne JSON)"""
+        try:
+            with open(chemin, "a", encoding="utf-8") as f:
+                f.write(self.ligne_json() + "\n")
+        except OSError as e:
+            print(f"Erreur lors de l'écriture des métriques: {e}", file=sys.stderr)
+
+    def prometheus(self):
+        """Export au format texte de Prometheus"""
+        with self._lock:
+            durees = {cle: list(mesure) for cle, mesure in self._durees.items()}
+            compteurs = dict(self._compteurs)
+        lignes = [
+            f"# TYPE {PREFIXE}_etape_secondes summary",
+            f"# TYPE {PREFIXE}_etape_max_secondes gauge",
+        ]
+        for (etape, etiquettes), (nombre, cumul, maximum, _) in sorted(durees.items()):
+            etiq = _format_etiquettes(etiquettes, [("etape", etape)])
+            lignes.append(f"{PREFIXE}_etape_secondes_count{etiq} {nombre}")
+            lignes.append(f"{PREFIXE}_etape_secondes_sum{etiq} {cumul:.6f}")
+            lignes.append(f"{PREFIXE}_etape_max_secondes{etiq} {maximum:.6f}")
+        noms = sorted({nom for nom, _ in compteurs})
+        for nom in noms:
+            lignes.append(f"# TYPE {PREFIXE}_{nom}_total counter")
+            for (nom_compteur, etiquettes), valeur in sorted(compteurs.items()):
+                if nom_compteur == nom:
+                    lignes.append(f"{PREFIXE}_{nom}_total{_format_etiquettes(etiquettes)} {valeur}")
+        for nom, valeur in sorted(self._valeurs_jauges().items()):
+            lignes.append(f"# TYPE {PREFIXE}_{nom} gauge")
+            if isinstance(valeur, dict):
+                for etiquette, v in sorted(valeur.items()):
+                    lignes.append(f'{PREFIXE}_{nom}{{cle="{etiquette}"}} {v}')
+            elif valeur is not None:
+                lignes.append(f"{PREFIXE}_{nom} {valeur}")
+        return "\n".join(lignes) + "\n"
+
+
+class Profileur:
+    """Profilage activable à chaud (cProfile, tracemalloc)"""
+
+    def __init__(self, dossier=None):
+        self.dossier = dossier
+        self._profil = None
+
+    def _chemin(self, nom):
+        dossier = self.dossier or cache_dir("profils")
+        return os.path.join(dossier, f"{nom}-{time.strftime('%Y%m%d-%H%M%S')}")
+
+    @property
+    def cprofile_actif(self):
+        return self._profil is not None
+
+    def basculer_cprofile(self):
+        """Démarre cProfile, ou l'arrête et renvoie le chemin du .prof écrit"""
+        if self._profil is None:
+            import cProfile
+            self._profil = cProfile.Profile()
+            self._profil.enable()
+            return None
+        profil, self._profil = self._profil, None
+        profil.disable()
+        chemin = self._chemin("cprofile") + ".prof"
+        profil.dump_stats(chemin)
+        return chemin
+
+    def instantane_memoire(self, limite=30):
+        """Écrit les ``limite`` plus grosses allocations (par ligne) et renvoie le chemin.
+
+        Le premier appel démarre tracemalloc : seules les allocations
+        postérieures sont visibles aux appels suivants.
+        """
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        statistiques = tracemalloc.take_snapshot().statistics("lineno")
+        chemin = self._chemin("tracemalloc") + ".txt"
+        actuel, pic = tracemalloc.get_traced_memory()
+        with open(chemin, "w", encoding="utf-8") as f:
+            f.write(f"tracé : {actuel / 1e6:.1f} Mo (pic {pic / 1e6:.1f} Mo)\n")
+            for stat in statistiques[:limite]:
+                f.write(f"{stat}\n")
+        return chemin
+
+
+# Registre partagé par l'application, la ligne de commande et le serveur
+metrics = Metrics()
+metrics.jauge("rss_octets", rss)
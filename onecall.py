@@ -0,0 +1,94 @@
+"""Adaptation des réponses One Call (API 3.0) au format /weather et /forecast.
+
+Un seul appel One Call renvoie la météo actuelle, 48 h de prévisions
+horaires et 8 jours de prévisions quotidiennes. Ces fonctions en tirent des
+dictionnaires de même forme que les réponses /weather et /forecast, pour
+que le reste de l'application (traitement, vues, historique) n'ait pas à
+distinguer les deux sources :
+
+- les heures sont regroupées en créneaux de 3 h alignés comme ceux de
+  /forecast (pluie et neige cumulées sur le créneau) ;
+- au-delà des 48 h, chaque jour de prévision quotidienne donne un créneau.
+"""
+
+PAS = 3 * 3600
+
+
+def _creneau(dt, temp, ressenti, source, pluie, neige):
+    entree = {
+        "dt": dt,
+        "main": {"temp": temp, "feels_like": ressenti,
+                 "humidity": source["humidity"], "pressure": source["pressure"]},
+        "weather": source["weather"],
+        "wind": {"speed": source["wind_speed"], "deg": source.get("wind_deg", 0)},
+    }
+    if pluie:
+        entree["rain"] = {"3h": round(pluie, 2)}
+    if neige:
+        entree["snow"] = {"3h": round(neige, 2)}
+    return entree
+
+
+def meteo_actuelle(data, lieu):
+    """Réponse One Call -> réponse de forme /weather"""
+    actuelle = data["current"]
+    jour = (data.get("daily") or [{}])[0].get("temp", {})
+    meteo = {
+        "coord": {"lat": data.get("lat"), "lon": data.get("lon")},
+        "name": lieu["nom"],
+        "dt": actuelle["dt"],
+        "timezone": data.get("timezone_offset", 0),
+        "sys": {"country": lieu["pays"], "sunrise": actuelle.get("sunrise"), "sunset": actuelle.get("sunset")},
+        "weather": actuelle["weather"],
+        "main": {
+            "temp": actuelle["temp"],
+            "feels_like": actuelle["feels_like"],
+            "temp_min": jour.get("min", actuelle["temp"]),
+            "temp_max": jour.get("max", actuelle["temp"]),
+            "humidity": actuelle["humidity"],
+            "pressure": actuelle["pressure"],
+        },
+        "wind": {"speed": actuelle["wind_speed"], "deg": actuelle.get("wind_deg", 0)},
+        "clouds": {"all": actuelle.get("clouds", 0)},
+        "visibility": actuelle.get("visibility", 0),
+    }
+    for cle in ("rain", "snow"):
+        if cle in actuelle:
+            meteo[cle] = actuelle[cle]
+    return meteo
+
+
+def previsions(data, lieu):
+    """Réponse One Call -> réponse de forme /forecast"""
+    creneaux = {}
+    for heure in data.get("hourly", []):
+        creneaux.setdefault(heure["dt"] // PAS * PAS, []).append(heure)
+
+    liste = []
+    for dt, heures in sorted(creneaux.items()):
+        # Conditions du début du créneau, précipitations cumulées
+        premiere = heures[0]
+        liste.append(_creneau(
+            dt, premiere["temp"], premiere["feels_like"], premiere,
+            sum(h.get("rain", {}).get("1h", 0) for h in heures),
+            sum(h.get("snow", {}).get("1h", 0) for h in heures),
+        ))
+
+    fin = max(creneaux) + PAS if creneaux else 0
+    for jour in data.get("daily", []):
+        if jour["dt"] >= fin:
+            liste.append(_creneau(
+                jour["dt"], jour["temp"]["day"], jour["feels_like"]["day"], jour,
+                jour.get("rain", 0), jour.get("snow", 0),
+            ))
+
+    return {
+        "cod": "200",
+        "cnt": len(liste),
+        "list": liste,
+        "city": {
+            "name": lieu["nom"], "country": lieu["pays"],
+            "coord": {"lat": data.get("lat"), "lon": data.get("lon")},
+            "timezone": data.get("timezone_offset", 0),
+        },
+    }
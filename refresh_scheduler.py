@@ -0,0 +1,214 @@
+"""Planification adaptative des actualisations (remplace l'intervalle fixe).
+
+L'intervalle choisi dans l'interface sert de base, puis :
+
+- l'échéance est calée sur la prochaine mise à jour attendue des données
+  amont (champ ``dt`` de la météo actuelle et période observée entre deux
+  ``dt``) : on interroge l'API juste après qu'elle a de nouvelles données ;
+- l'intervalle s'allonge tant que les données sont inchangées, et après
+  une erreur on réessaie vite puis de plus en plus lentement ;
+- il raccourcit quand les conditions changent vite (écart de température
+  ou de pression, précipitations, orage, vent fort) ;
+- la planification est suspendue tant que la fenêtre est masquée.
+
+Les échéances sont absolues et partent du début de l'exécution précédente :
+une actualisation lente ne décale pas les suivantes. Chaque exécution est
+journalisée avec sa latence et le nom de la planification (logger
+``meteo.actualisation``).
+"""
+import logging
+import time
+from collections import deque
+
+logger = logging.getLogger("meteo.actualisation")
+
+# Décalage après l'instant de mise à jour amont attendu (publication)
+MARGE_AMONT = 30
+
+# Période de mise à jour de la météo actuelle en l'absence de mesure
+PERIODE_AMONT_DEFAUT = 600
+
+
+def conditions_changeantes(precedente, meteo):
+    """True si la météo évolue vite et mérite des actualisations plus fréquentes"""
+    if not meteo:
+        return False
+    # Groupes OpenWeatherMap 2xx à 6xx : orage, bruine, pluie, neige
+    if any(condition.get('id', 800) < 700 for condition in meteo.get('weather', [])):
+        return True
+    if meteo.get('wind', {}).get('speed', 0) >= 10:
+        return True
+    if not precedente:
+        return False
+    return (abs(meteo['main']['temp'] - precedente['main']['temp']) >= 2
+            or abs(meteo['main']['pressure'] - precedente['main']['pressure']) >= 3)
+
+
+def prochain_delai(base, maintenant, dt=None, periode=None, inchange=0, erreurs=0,
+                   rapide=False, minimum=60, facteur_max=4):
+    """Délai (secondes) avant la prochaine actualisation, et sa raison.
+
+    ``maintenant`` et ``dt`` sont des instants Unix; ``inchange`` et
+    ``erreurs`` comptent les exécutions consécutives sans nouvelles données
+    ou en échec.
+    """
+    maximum = base * facteur_max
+    minimum = min(minimum, base)
+    if erreurs:
+        # 1 min, 2 min, 4 min... borné
+        return min(minimum * 2 ** (erreurs - 1), maximum), f"erreur ({erreurs})"
+
+    if rapide:
+        delai, raison = max(minimum, base / 2), "conditions changeantes"
+    elif inchange:
+        delai, raison = min(base * 2 ** inchange, maximum), f"inchangé ({inchange})"
+    else:
+        delai, raison = base, "intervalle"
+
+    if dt is not None and periode:
+        # Mise à jour amont la plus proche de l'échéance, jamais trop tôt
+        depart = dt + MARGE_AMONT
+        aligne = depart + round((maintenant + delai - depart) / periode) * periode
+        while aligne < maintenant + minimum:
+            aligne += periode
+        delai, raison = aligne - maintenant, f"{raison}, calé sur dt"
+    return delai, raison
+
+
+class RefreshScheduler:
+    """Exécute ``action`` aux échéances calculées, sur le thread Tk.
+
+    ``action()`` lance une actualisation (asynchrone) et renvoie False si
+    rien n'a été lancé; la fin de l'actualisation est signalée par
+    ``termine``, qui programme la suivante.
+    """
+
+    def __init__(self, root, action, intervalle, minimum=60, facteur_max=4, nom="actualisation"):
+        self.root = root
+        self.nom = nom
+        self.action = action
+        self.intervalle = intervalle  # Secondes (choix de l'utilisateur)
+        self.minimum = minimum
+        self.facteur_max = facteur_max
+        self.journal = deque(maxlen=100)  # Dernières exécutions (dict)
+        self._job = None
+        self._echeance = None      # time.monotonic() de la prochaine exécution
+        self._raison = "démarrage"
+        self._debut = None         # Début de l'exécution en cours
+        self._dernier_debut = None
+        self._en_pause = False
+        self._dt = None
+        self._dts = deque(maxlen=6)  # dt distincts observés (période amont)
+        self._inchange = 0
+        self._erreurs = 0
+
+    @property
+    def periode_amont(self):
+        """Période de mise à jour amont estimée (médiane des écarts entre dt)"""
+        ecarts = sorted(b - a for a, b in zip(self._dts, list(self._dts)[1:]) if b > a)
+        return ecarts[len(ecarts) // 2] if ecarts else PERIODE_AMONT_DEFAUT
+
+    @property
+    def prochaine(self):
+        """Secondes avant la prochaine exécution (None si aucune n'est prévue)"""
+        if self._echeance is None:
+            return None
+        return max(0.0, self._echeance - time.monotonic())
+
+    def demarrer(self):
+        """Première exécution, sauf si une actualisation a déjà été lancée"""
+        if self._dernier_debut is None:
+            self.executer_maintenant("démarrage")
+
+    def executer_maintenant(self, raison="manuel"):
+        """Actualisation immédiate (nouvelle recherche); la planification repart de là"""
+        self._inchange = self._erreurs = 0
+        self._annuler()
+        self._executer(raison)
+
+    def termine(self, dt=None, change=True, erreur=False, rapide=False):
+        """Fin de l'actualisation en cours : journal et prochaine échéance"""
+        if self._debut is None:
+            return
+        debut, self._debut = self._debut, None
+        latence = time.monotonic() - debut
+
+        if erreur:
+            self._erreurs += 1
+        else:
+            self._erreurs = 0
+            self._inchange = 0 if change else self._inchange + 1
+            if dt is not None:
+                self._dt = dt
+                if not self._dts or dt > self._dts[-1]:
+                    self._dts.append(dt)
+
+        # Délai compté depuis le début de l'exécution (sans dérive)
+        debut_unix = time.time() - latence
+        delai, raison = prochain_delai(
+            self.intervalle, debut_unix, dt=self._dt, periode=self.periode_amont,
+            inchange=self._inchange, erreurs=self._erreurs, rapide=rapide and not erreur,
+            minimum=self.minimum, facteur_max=self.facteur_max,
+        )
+        self.journal.append({
+            "debut": debut_unix, "raison": self._raison, "latence": latence,
+            "erreur": erreur, "change": change, "delai": delai, "prochaine_raison": raison,
+        })
+        logger.info("%s (%s) en %.0f ms, prochaine dans %.0f s : %s",
+                    self.nom, self._raison, latence * 1000, delai, raison)
+        self._armer(debut + delai, raison)
+
+    def set_intervalle(self, secondes):
+        """Nouvel intervalle de base, sans actualisation immédiate.
+
+        L'échéance repart de la dernière exécution; si elle est déjà
+        dépassée, l'actualisation a lieu tout de suite.
+        """
+        self.intervalle = secondes
+        self._inchange = 0
+        if self._debut is None and self._dernier_debut is not None:
+            self._armer(self._dernier_debut + secondes, "nouvel intervalle")
+
+    def pause(self):
+        """Fenêtre masquée : plus d'actualisation (l'échéance est conservée)"""
+        self._en_pause = True
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+
+    def reprendre(self):
+        """Fenêtre de nouveau visible : échéance dépassée -> actualisation immédiate"""
+        if not self._en_pause:
+            return
+        self._en_pause = False
+        if self._echeance is not None:
+            self._armer(self._echeance, "reprise")
+
+    def arreter(self):
+        self._annuler()
+        self._echeance = None
+
+    def _armer(self, echeance, raison):
+        self._annuler()
+        self._echeance = echeance
+        self._raison = raison
+        if self._en_pause:
+            return
+        attente = max(0, int((echeance - time.monotonic()) * 1000))
+        self._job = self.root.after(attente, self._executer)
+
+    def _annuler(self):
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+
+    def _executer(self, raison=None):
+        self._job = None
+        self._echeance = None
+        if raison is not None:
+            self._raison = raison
+        self._debut = self._dernier_debut = time.monotonic()
+        if self.action() is False:
+            # Rien à actualiser : simple intervalle
+            self._debut = None
+            self._armer(self._dernier_debut + self.intervalle, "intervalle")
@@ -0,0 +1,194 @@
+"""Cache des réponses de l'API OpenWeatherMap.
+
+Chaque endpoint a sa propre durée de vie (courte pour la météo actuelle,
+longue pour les prévisions 5 jours). Les en-têtes HTTP ``Cache-Control``,
+``ETag`` et ``Last-Modified`` sont respectés quand le serveur les envoie,
+et le cache est sauvegardé sur disque pour qu'un redémarrage reparte à chaud.
+
+Les sauvegardes sont regroupées (au plus une toutes les ``DELAI_SAUVEGARDE``
+secondes, et une dernière à la sortie) et sérialisées hors du verrou : un
+lot de réponses ne réécrit pas le fichier à chaque entrée et ne bloque pas
+les lectures des autres threads. Les entrées expirées depuis plus de
+``RETENTION`` sont oubliées et le cache est borné à ``MAX_ENTREES``.
+"""
+import atexit
+import json
+import os
+import re
+import threading
+import time
+
+from app_paths import cache_dir
+
+# Durées de vie par défaut, en secondes
+TTL_PAR_DEFAUT = {
+    "weather": 120,
+    "forecast": 3 * 3600,
+    "onecall": 120,  # Contient la météo actuelle
+}
+
+# Délai de regroupement des écritures disque, en secondes
+DELAI_SAUVEGARDE = 2.0
+
+# Une entrée expirée depuis plus longtemps n'est plus servie, même hors ligne
+RETENTION = 7 * 24 * 3600
+
+# Nombre maximal d'entrées (les plus anciennes sont évincées)
+MAX_ENTREES = 2000
+
+
+class ResponseCache:
+    """Cache TTL persistant avec requêtes conditionnelles"""
+
+    def __init__(self, ttls=None, chemin=None):
+        self.ttls = dict(TTL_PAR_DEFAUT)
+        if ttls:
+            self.ttls.update(ttls)
+        self.chemin = chemin or os.path.join(cache_dir(), "responses.json")
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0  # Réponses 304 Not Modified
+        self._entrees = {}
+        self._lock = threading.Lock()
+        self._ecriture = threading.Lock()  # Sérialise les écritures du fichier
+        self._minuteur = None  # Sauvegarde différée en attente
+        self._charger()
+        atexit.register(self._sauver_en_attente)
+
+    @staticmethod
+    def cle(endpoint, params):
+        """Clé stable pour un endpoint et ses paramètres (hors clé API)"""
+        items = sorted((k, str(v).strip().lower()) for k, v in params.items() if k != "appid")
+        return endpoint + "?" + "&".join(f"{k}={v}" for k, v in items)
+
+    def frais(self, cle):
+        """Renvoie la réponse en cache si elle n'a pas expiré, sinon None"""
+        with self._lock:
+            entree = self._entrees.get(cle)
+            if entree is not None and entree["expire"] > time.time():
+                self.hits += 1
+                return entree["data"]
+            self.misses += 1
+            return None
+
+    def dernier_connu(self, cle):
+        """Renvoie la dernière réponse stockée, même expirée"""
+        with self._lock:
+            entree = self._entrees.get(cle)
+            return entree["data"] if entree else None
+
+    def entetes_conditionnels(self, cle):
+        """En-têtes If-None-Match / If-Modified-Since pour revalider une entrée"""
+        with self._lock:
+            entree = self._entrees.get(cle)
+        entetes = {}
+        if entree:
+            if entree.get("etag"):
+                entetes["If-None-Match"] = entree["etag"]
+            if entree.get("last_modified"):
+                entetes["If-Modified-Since"] = entree["last_modified"]
+        return entetes
+
+    def stocker(self, cle, endpoint, data, entetes):
+        """Enregistre une réponse 200 et sa durée de vie"""
+        ttl = self._ttl(endpoint, entetes)
+        if ttl is None:
+            return
+        with self._lock:
+            self._entrees[cle] = {
+                "endpoint": endpoint,
+                "data": data,
+                "expire": time.time() + ttl,
+                "etag": entetes.get("ETag"),
+                "last_modified": entetes.get("Last-Modified"),
+            }
+        self._planifier()
+
+    def revalider(self, cle, endpoint, entetes):
+        """Prolonge une entrée après un 304 et renvoie ses données"""
+        ttl = self._ttl(endpoint, entetes) or 0
+        with self._lock:
+            entree = self._entrees.get(cle)
+            if entree is None:
+                return None
+            self.revalidations += 1
+            # Nouvelle entrée plutôt que modification sur place : une
+            # sauvegarde en cours peut sérialiser l'ancienne hors du verrou
+            self._entrees[cle] = dict(entree, expire=time.time() + ttl)
+            data = entree["data"]
+        self._planifier()
+        return data
+
+    def stats(self):
+        """Compteurs hit/miss pour dimensionner les TTL selon le quota API"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidations": self.revalidations,
+                "hit_ratio": self.hits / total if total else 0.0,
+                "entrees": len(self._entrees),
+            }
+
+    def sauver(self):
+        """Écrit le cache sur disque (écriture atomique)"""
+        with self._ecriture:
+            with self._lock:
+                if self._minuteur is not None:
+                    self._minuteur.cancel()
+                    self._minuteur = None
+                self._purger()
+                entrees = dict(self._entrees)
+            # Sérialisation hors du verrou : les lectures ne sont pas bloquées
+            contenu = json.dumps(entrees)
+            tmp = f"{self.chemin}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.write(contenu)
+                os.replace(tmp, self.chemin)
+            except OSError as e:
+                print(f"Erreur lors de la sauvegarde du cache: {e}")
+
+    def _planifier(self):
+        """Programme une sauvegarde (les stockages rapprochés n'en font qu'une)"""
+        with self._lock:
+            if self._minuteur is None:
+                self._minuteur = threading.Timer(DELAI_SAUVEGARDE, self.sauver)
+                self._minuteur.daemon = True
+                self._minuteur.start()
+
+    def _sauver_en_attente(self):
+        if self._minuteur is not None:
+            self.sauver()
+
+    def _purger(self):
+        """Oublie les entrées expirées depuis longtemps et borne la taille (verrou tenu)"""
+        limite = time.time() - RETENTION
+        for cle in [cle for cle, entree in self._entrees.items() if entree["expire"] < limite]:
+            del self._entrees[cle]
+        surplus = len(self._entrees) - MAX_ENTREES
+        if surplus > 0:
+            anciennes = sorted(self._entrees, key=lambda cle: self._entrees[cle]["expire"])[:surplus]
+            for cle in anciennes:
+                del self._entrees[cle]
+
+    def _charger(self):
+        try:
+            with open(self.chemin, encoding="utf-8") as f:
+                self._entrees = json.load(f)
+        except (OSError, ValueError):
+            self._entrees = {}
+        self._purger()
+
+    def _ttl(self, endpoint, entetes):
+        """Durée de vie en secondes, None si la réponse ne doit pas être stockée"""
+        cache_control = (entetes.get("Cache-Control") or "").lower()
+        if "no-store" in cache_control:
+            return None
+        if "no-cache" in cache_control:
+            return 0
+        max_age = re.search(r"max-age=(\d+)", cache_control)
+        if max_age:
+            return int(max_age.group(1))
+        return self.ttls.get(endpoint, 0)
@@ -0,0 +1,151 @@
+"""Instantané du dernier état affiché, pour un démarrage hors ligne immédiat.
+
+À chaque actualisation réussie, l'état traité d'une ville est écrit dans un
+fichier binaire compact (un par ville) :
+
+- un en-tête JSON : ville, date d'enregistrement, réponse /weather, version
+  (empreinte) des prévisions et description des blocs qui suivent ;
+- les colonnes du DataFrame des prévisions (``traiter_previsions``), chacune
+  en tableau NumPy brut aligné; les colonnes texte (description, icône) sont
+  codées par catégories ;
+- les PNG des icônes utilisées.
+
+Au démarrage, le fichier est projeté en mémoire (``np.memmap``) et le
+DataFrame reconstruit sans retraiter la réponse JSON : l'interface s'affiche
+tout de suite, avant toute requête réseau.
+"""
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+from app_paths import cache_dir
+from geocoding import normaliser
+
+MAGIC = b"METEOSN1"
+FORMAT = 1
+ALIGNEMENT = 64
+
+# Colonnes dérivées de la date, recalculées au chargement
+COLONNES_DERIVEES = ("jour", "heure")
+
+
+def _aligner(n, alignement=ALIGNEMENT):
+    return -(-n // alignement) * alignement
+
+
+class SnapshotStore:
+    """Instantanés par ville (dossier ``instantanes`` du cache)"""
+
+    def __init__(self, dossier=None):
+        self.dossier = dossier or cache_dir("instantanes")
+        self._lock = threading.Lock()
+
+    def chemin(self, ville):
+        cle = hashlib.sha1(normaliser(ville).encode()).hexdigest()[:16]
+        return os.path.join(self.dossier, f"{cle}.bin")
+
+    def enregistrer(self, ville, meteo, df, version, icones=()):
+        """Écrit l'instantané d'une ville (thread de travail, écriture atomique).
+
+        ``icones`` : tuples (code, variante, octets PNG).
+        """
+        import pandas as pd
+
+        colonnes, blocs = [], []
+        decalage = 0
+
+        def ajouter(tableau, description):
+            nonlocal decalage
+            tableau = np.ascontiguousarray(tableau)
+            description.update(decalage=decalage, taille=tableau.nbytes, dtype=tableau.dtype.str)
+            blocs.append((decalage, tableau))
+            decalage = _aligner(decalage + tableau.nbytes, 8)
+            return description
+
+        for nom in df.columns:
+            if nom in COLONNES_DERIVEES:
+                continue
+            serie = df[nom]
+            if pd.api.types.is_numeric_dtype(serie) or pd.api.types.is_datetime64_dtype(serie):
+                colonnes.append(ajouter(serie.to_numpy(), {"nom": nom}))
+            else:
+                codes, categories = pd.factorize(serie)
+                colonnes.append(ajouter(codes.astype("<i2"), {"nom": nom, "categories": list(categories)}))
+        icones = [ajouter(np.frombuffer(data, dtype=np.uint8), {"code": code, "variante": variante})
+                  for code, variante, data in icones]
+
+        entete = json.dumps({
+            "format": FORMAT, "ville": ville, "enregistre": time.time(), "meteo": meteo,
+            "version": version, "lignes": len(df), "colonnes": colonnes, "icones": icones,
+        }, ensure_ascii=False).encode()
+        debut = _aligner(len(MAGIC) + 4 + len(entete))
+
+        chemin = self.chemin(ville)
+        tmp = f"{chemin}.{threading.get_ident()}.tmp"
+        try:
+            with self._lock, open(tmp, "wb") as f:
+                f.write(MAGIC + len(entete).to_bytes(4, "little") + entete)
+                for position, tableau in blocs:
+                    f.seek(debut + position)
+                    f.write(tableau.tobytes())
+                f.truncate(debut + decalage)
+            os.replace(tmp, chemin)
+        except OSError as e:
+            print(f"Erreur lors de l'enregistrement de l'instantané: {e}", file=sys.stderr)
+
+    def charger(self, ville):
+        """Dernier instantané d'une ville, ou None.
+
+        Renvoie un dict {"ville", "enregistre", "meteo", "version", "df",
+        "icones"}; ``icones`` est une liste de (code, variante, octets PNG).
+        """
+        try:
+            brut = np.memmap(self.chemin(ville), dtype=np.uint8, mode="r")
+        except (OSError, ValueError):
+            return None
+        try:
+            return self._lire(brut)
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            print(f"Instantané illisible ignoré ({ville}): {e}", file=sys.stderr)
+            return None
+
+    def _lire(self, brut):
+        import pandas as pd
+
+        if bytes(brut[:len(MAGIC)]) != MAGIC:
+            raise ValueError("signature inconnue")
+        taille = int.from_bytes(bytes(brut[len(MAGIC):len(MAGIC) + 4]), "little")
+        entete = json.loads(bytes(brut[len(MAGIC) + 4:len(MAGIC) + 4 + taille]))
+        if entete["format"] != FORMAT:
+            raise ValueError(f"format {entete['format']}")
+        debut = _aligner(len(MAGIC) + 4 + taille)
+
+        def bloc(description):
+            position = debut + description["decalage"]
+            return brut[position:position + description["taille"]].view(description["dtype"])
+
+        donnees = {}
+        for colonne in entete["colonnes"]:
+            tableau = bloc(colonne)
+            if "categories" in colonne:
+                tableau = pd.Categorical.from_codes(tableau, colonne["categories"]).astype(str)
+            donnees[colonne["nom"]] = tableau
+        df = pd.DataFrame(donnees)
+        if len(df) != entete["lignes"]:
+            raise ValueError("instantané tronqué")
+        df["jour"] = df["date"].dt.date
+        df["heure"] = df["date"].dt.hour
+
+        return {
+            "ville": entete["ville"],
+            "enregistre": entete["enregistre"],
+            "meteo": entete["meteo"],
+            "version": entete["version"],
+            "df": df,
+            "icones": [(icone["code"], icone["variante"], bloc(icone).tobytes()) for icone in entete["icones"]],
+        }
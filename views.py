@@ -0,0 +1,338 @@
+"""Vues Tk à widgets persistants.
+
+Les widgets sont créés une fois puis seulement reconfigurés : à chaque
+actualisation, seules les options dont la valeur a changé sont envoyées à
+Tcl, et des lignes ne sont ajoutées ou retirées que si l'ensemble des jours
+(ou des détails) change. Cela évite le scintillement et les allocations
+Tcl d'un « tout détruire / tout recréer ».
+
+La liste des prévisions est de plus virtualisée : seules les lignes visibles
+dans le canvas ont des widgets, recyclés au défilement.
+"""
+import tkinter as tk
+from tkinter import ttk
+
+
+class _Retenu:
+    """Mémorise les dernières options appliquées à chaque widget"""
+
+    def __init__(self):
+        self._options = {}
+
+    def configurer(self, widget, **options):
+        """N'applique que les options dont la valeur a changé"""
+        actuelles = self._options.setdefault(str(widget), {})
+        modifiees = {}
+        for nom, valeur in options.items():
+            # Les images sont comparées par identité (PhotoImage partagées)
+            precedente = actuelles.get(nom)
+            if precedente is valeur or (nom != "image" and precedente == valeur):
+                continue
+            modifiees[nom] = valeur
+            actuelles[nom] = valeur
+        if modifiees:
+            widget.config(**modifiees)
+        if "image" in modifiees:
+            widget.image = modifiees["image"]  # Garder une référence
+        return bool(modifiees)
+
+    def oublier(self, widget):
+        self._options.pop(str(widget), None)
+
+
+class CreneauWidget:
+    """Une tranche horaire : heure, icône, température, description"""
+
+    def __init__(self, parent, retenu):
+        self.retenu = retenu
+        self.frame = tk.Frame(parent, bg="white", width=100)
+        self.frame.pack(side=tk.LEFT, padx=10, fill=tk.Y)
+        self.heure = tk.Label(self.frame, font=("Arial", 10), bg="white")
+        self.heure.pack()
+        self.icone = tk.Label(self.frame, bg="white")
+        self.icone.pack()
+        self.temp = tk.Label(self.frame, font=("Arial", 10), bg="white")
+        self.temp.pack()
+        self.desc = tk.Label(self.frame, font=("Arial", 8), bg="white", wraplength=80)
+        self.desc.pack()
+
+    def afficher(self, visible):
+        if visible:
+            self.frame.pack(side=tk.LEFT, padx=10, fill=tk.Y)
+        else:
+            self.frame.pack_forget()
+
+    def mettre_a_jour(self, heure, photo, temperature, description):
+        self.retenu.configurer(self.heure, text=heure)
+        self.retenu.configurer(self.icone, image=photo if photo is not None else "")
+        self.retenu.configurer(self.temp, text=f"{temperature:.1f}°C")
+        self.retenu.configurer(self.desc, text=description)
+
+    def detruire(self):
+        for widget in (self.heure, self.icone, self.temp, self.desc):
+            self.retenu.oublier(widget)
+        self.frame.destroy()
+
+
+class JourWidget:
+    """Une ligne de jour : date, créneaux horaires et résumé"""
+
+    def __init__(self, parent, retenu):
+        self.retenu = retenu
+        self.frame = tk.Frame(parent, bg="white", bd=1, relief=tk.RIDGE)
+        self.frame.grid_columnconfigure(0, weight=1)
+
+        self.date_label = tk.Label(self.frame, font=("Arial", 12, "bold"), bg="white")
+        self.date_label.pack(fill=tk.X, padx=5, pady=5)
+
+        # Frame pour contenir les heures avec centrage
+        heures_container = tk.Frame(self.frame, bg="white")
+        heures_container.pack(fill=tk.X, padx=5, pady=5)
+        self.heures_frame = tk.Frame(heures_container, bg="white")
+        self.heures_frame.pack(expand=True, anchor='center')
+        self.creneaux = []
+        self._affiches = 0  # Créneaux affichés (les suivants sont masqués)
+
+        resume_frame = tk.Frame(self.frame, bg="#f5f5f5")
+        resume_frame.pack(fill=tk.X, padx=5, pady=5)
+        self.resume_label = tk.Label(resume_frame, font=("Arial", 10, "italic"), bg="#f5f5f5")
+        self.resume_label.pack()
+
+    def mettre_a_jour(self, date_str, creneaux, resume):
+        """``creneaux`` : liste de tuples (heure, photo, température, description)"""
+        self.retenu.configurer(self.date_label, text=date_str)
+
+        # Ajuster le nombre de créneaux (premier et dernier jour partiels) :
+        # les créneaux en trop sont masqués et resserviront à la ligne suivante
+        while len(self.creneaux) < len(creneaux):
+            self.creneaux.append(CreneauWidget(self.heures_frame, self.retenu))
+        for i in range(min(self._affiches, len(creneaux)), max(self._affiches, len(creneaux))):
+            self.creneaux[i].afficher(i < len(creneaux))
+        self._affiches = len(creneaux)
+
+        for widget, valeurs in zip(self.creneaux, creneaux):
+            widget.mettre_a_jour(*valeurs)
+
+        self.retenu.configurer(self.resume_label, text=resume)
+
+    def detruire(self):
+        for creneau in self.creneaux:
+            creneau.detruire()
+        self.retenu.oublier(self.date_label)
+        self.retenu.oublier(self.resume_label)
+        self.frame.destroy()
+
+
+class PrevisionsView:
+    """Liste virtualisée des jours de prévision dans un canvas défilant.
+
+    Chaque ligne occupe une hauteur fixe (mesurée sur les lignes affichées);
+    seules les lignes visibles, plus ``MARGE`` de part et d'autre, ont un
+    ``JourWidget``, placé dans le canvas par ``create_window``. Au
+    défilement (molette, barre), les lignes sorties de la zone visible sont
+    réattribuées aux jours qui y entrent : le nombre de widgets et le coût
+    d'un défilement ne dépendent pas du nombre de jours.
+    """
+
+    MARGE = 1
+    PADX = 25  # Marges de l'ancienne mise en page (conteneur + ligne)
+    PADY = 5
+
+    def __init__(self, canvas, scrollbar=None):
+        self.canvas = canvas
+        self.scrollbar = scrollbar
+        self.retenu = _Retenu()
+        self.jours = []      # (date, date_str, creneaux, resume)
+        self.hauteur = None  # Pas vertical d'une ligne (mesuré)
+        self._lignes = {}    # index du jour -> (JourWidget, fenêtre du canvas)
+        self._libres = []    # (JourWidget, fenêtre) masqués, prêts à resservir
+        self._largeur = 1
+        self._verification = None
+        canvas.configure(yscrollcommand=self._on_defilement)
+        canvas.bind('<Configure>', self._on_configure, add="+")
+
+    @property
+    def nb_widgets(self):
+        """Lignes réalisées (affichées ou en réserve)"""
+        return len(self._lignes) + len(self._libres)
+
+    def mettre_a_jour(self, jours):
+        """``jours`` : liste ordonnée de (date, date_str, creneaux, resume)"""
+        self.jours = list(jours)
+        if self.hauteur is None and self.jours:
+            self._mesurer()
+        # Les lignes affichées reçoivent leurs nouvelles valeurs (seules les
+        # options modifiées sont envoyées à Tcl); les autres attendront
+        for i in list(self._lignes):
+            if i < len(self.jours):
+                self._lignes[i][0].mettre_a_jour(*self.jours[i][1:])
+        self._mettre_a_jour_region()
+        self._afficher_visibles()
+
+    def _mesurer(self):
+        """Hauteur d'une ligne, mesurée sur le premier jour"""
+        widget, fenetre = self._ligne()
+        widget.mettre_a_jour(*self.jours[0][1:])
+        self.canvas.update_idletasks()
+        self.hauteur = widget.frame.winfo_reqheight() + 2 * self.PADY
+        self._liberer(widget, fenetre)
+
+    def _ligne(self):
+        """Une ligne réutilisable (réserve, sinon nouvelle)"""
+        if self._libres:
+            return self._libres.pop()
+        widget = JourWidget(self.canvas, self.retenu)
+        fenetre = self.canvas.create_window(
+            self.PADX, 0, window=widget.frame, anchor='nw',
+            width=max(self._largeur - 2 * self.PADX, 1), state='hidden',
+        )
+        return widget, fenetre
+
+    def _liberer(self, widget, fenetre):
+        self.canvas.itemconfigure(fenetre, state='hidden')
+        self._libres.append((widget, fenetre))
+
+    def _mettre_a_jour_region(self):
+        hauteur = len(self.jours) * (self.hauteur or 0)
+        self.canvas.configure(scrollregion=(0, 0, self._largeur, hauteur))
+
+    def _afficher_visibles(self):
+        """Réalise les lignes de la zone visible et recycle les autres"""
+        if not self.jours or not self.hauteur:
+            for i in list(self._lignes):
+                self._liberer(*self._lignes.pop(i))
+            return
+        haut = self.canvas.canvasy(0)
+        bas = haut + max(self.canvas.winfo_height(), self.hauteur)
+        premier = max(int(haut // self.hauteur) - self.MARGE, 0)
+        dernier = min(int(bas // self.hauteur) + 1 + self.MARGE, len(self.jours))
+
+        for i in list(self._lignes):
+            if not premier <= i < dernier:
+                self._liberer(*self._lignes.pop(i))
+        for i in range(premier, dernier):
+            if i in self._lignes:
+                continue
+            widget, fenetre = self._lignes[i] = self._ligne()
+            widget.mettre_a_jour(*self.jours[i][1:])
+            self.canvas.coords(fenetre, self.PADX, i * self.hauteur + self.PADY)
+            self.canvas.itemconfigure(fenetre, state='normal', height=self.hauteur - 2 * self.PADY)
+
+        # Une ligne plus haute que les autres (descriptions sur deux lignes)
+        # agrandit le pas une fois sa géométrie calculée
+        if self._verification is None:
+            self._verification = self.canvas.after_idle(self._verifier_hauteur)
+
+    def _verifier_hauteur(self):
+        self._verification = None
+        requise = max((widget.frame.winfo_reqheight() + 2 * self.PADY
+                       for widget, _ in self._lignes.values()), default=0)
+        if requise > self.hauteur:
+            self.hauteur = requise
+            for i, (_, fenetre) in self._lignes.items():
+                self.canvas.coords(fenetre, self.PADX, i * self.hauteur + self.PADY)
+                self.canvas.itemconfigure(fenetre, height=self.hauteur - 2 * self.PADY)
+            self._mettre_a_jour_region()
+            self._afficher_visibles()
+
+    def _on_defilement(self, debut, fin):
+        if self.scrollbar is not None:
+            self.scrollbar.set(debut, fin)
+        self._afficher_visibles()
+
+    def _on_configure(self, event):
+        """Largeur des lignes calée sur le canvas; la hauteur change la zone visible"""
+        if event.width != self._largeur:
+            self._largeur = event.width
+            largeur = max(self._largeur - 2 * self.PADX, 1)
+            for _, fenetre in list(self._lignes.values()) + self._libres:
+                self.canvas.itemconfigure(fenetre, width=largeur)
+            self._mettre_a_jour_region()
+        self._afficher_visibles()
+
+
+class DetailsView:
+    """Tableau libellé / valeur des détails de la météo actuelle"""
+
+    def __init__(self, parent):
+        self.parent = parent
+        self.retenu = _Retenu()
+        self.lignes = []
+
+    def mettre_a_jour(self, details):
+        """``details`` : liste de tuples (libellé, valeur)"""
+        while len(self.lignes) < len(details):
+            i = len(self.lignes)
+            libelle = tk.Label(self.parent, font=("Arial", 10, "bold"), bg="white")
+            libelle.grid(row=i, column=0, sticky=tk.W, padx=5, pady=2)
+            valeur = tk.Label(self.parent, font=("Arial", 10), bg="white")
+            valeur.grid(row=i, column=1, sticky=tk.W, padx=5, pady=2)
+            self.lignes.append((libelle, valeur))
+        while len(self.lignes) > len(details):
+            for widget in self.lignes.pop():
+                self.retenu.oublier(widget)
+                widget.destroy()
+
+        for (libelle, valeur), (texte_libelle, texte_valeur) in zip(self.lignes, details):
+            self.retenu.configurer(libelle, text=f"{texte_libelle}:")
+            self.retenu.configurer(valeur, text=texte_valeur)
+
+
+class TableauVillesView:
+    """Tableau de bord multi-villes : une ligne de résumé par ville.
+
+    Un double-clic (ou Entrée) sur une ligne appelle ``on_selection(ville)``
+    pour afficher le détail et les prévisions de cette ville.
+    """
+
+    COLONNES = (
+        ("ville", "Ville", 180),
+        ("temperature", "Température", 100),
+        ("condition", "Condition", 200),
+        ("humidite", "Humidité", 90),
+        ("vent", "Vent", 90),
+        ("maj", "Mise à jour", 100),
+    )
+
+    def __init__(self, parent, villes, on_selection):
+        self.on_selection = on_selection
+        parent.grid_rowconfigure(0, weight=1)
+        parent.grid_columnconfigure(0, weight=1)
+
+        self.tree = ttk.Treeview(parent, columns=[c[0] for c in self.COLONNES], show="headings")
+        for nom, titre, largeur in self.COLONNES:
+            self.tree.heading(nom, text=titre)
+            self.tree.column(nom, width=largeur, anchor=tk.W)
+        scrollbar = ttk.Scrollbar(parent, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        scrollbar.grid(row=0, column=1, sticky="ns")
+
+        self.tree.bind("<Double-1>", self._on_selection)
+        self.tree.bind("<Return>", self._on_selection)
+
+        self._valeurs = {}
+        for ville in villes:
+            self.tree.insert("", tk.END, iid=ville, values=(ville, "…", "", "", "", ""))
+
+    def mettre_a_jour(self, ville, meteo, heure):
+        """Met à jour la ligne d'une ville (seulement si ses valeurs ont changé)"""
+        if meteo:
+            valeurs = (
+                ville,
+                f"{meteo['main']['temp']:.1f}°C",
+                meteo['weather'][0]['description'].capitalize(),
+                f"{meteo['main']['humidity']}%",
+                f"{meteo['wind']['speed']} m/s",
+                heure,
+            )
+        else:
+            valeurs = (ville, "Erreur", "", "", "", heure)
+        if self._valeurs.get(ville) != valeurs:
+            self._valeurs[ville] = valeurs
+            self.tree.item(ville, values=valeurs)
+
+    def _on_selection(self, event):
+        selection = self.tree.selection()
+        if selection:
+            self.on_selection(selection[0])